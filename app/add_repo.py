@@ -11,6 +11,11 @@
 5. Identifies required -dev packages for the Dockerfile
 
 Requires: gh CLI authenticated (https://cli.github.com/)
+Set OMNIBOR_GH_DIRECT=1 to call the REST API over HTTPS
+with the gh token instead of one gh process per request,
+and OMNIBOR_GH_CACHE=<file> to keep ETags across runs.
+OMNIBOR_GH_CACHE_TTL=<duration> (e.g. 1h) reuses gh CLI
+responses via gh api --cache.
 
 Usage:
 
@@ -22,6 +27,7 @@
 Classes:
 
     - GitHubClient: encapsulates all gh CLI / GitHub API calls
+    - FileIndex: shared lookup index over a repo file list
     - BuildSystemDetector: detects build system from file list
     - DependencyAnalyzer: inspects config files for dependency flags
     - BinaryDetector: detects output binaries from Makefiles
@@ -32,14 +38,25 @@
 
 import argparse
 import base64
+import functools
+import http.client
 import json
+import os
 import re
 import subprocess
 import sys
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from data_loader import DataLoader
+from data_loader import DataLoader, JsonCache
+
+# libyaml-backed dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
 
 
 # ============================================================
@@ -47,20 +64,340 @@
 # ============================================================
 
 class GitHubClient:
-    """Encapsulates all GitHub API interactions via gh CLI."""
+    """Encapsulates all GitHub API interactions via gh CLI.
+
+    By default each api() call shells out to ``gh api``.
+    With direct=True (from_env(): OMNIBOR_GH_DIRECT=1) REST calls go
+    over kept-alive HTTPS connections instead, using the
+    token from ``gh auth token`` fetched once.
+    """
+
+    API_HOST = "api.github.com"
+    USER_AGENT = "omnibor-analysis"
+    JSON_MEDIA_TYPE = "application/vnd.github+json"
+    RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+    # Directories get_file_tree lists one level into
+    SCAN_SUBDIRS = ("src", "lib", "auto")
+
+    # get_repo_bundle: info + languages + the same tree
+    # get_file_tree lists (root, then SCAN_SUBDIRS)
+    _BUNDLE_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    nameWithOwner description url stargazerCount
+    defaultBranchRef { name }
+    primaryLanguage { name }
+    languages(first: 20) { edges { size node { name } } }
+    root: object(expression: "HEAD:") { ...entries }
+    src: object(expression: "HEAD:src") { ...entries }
+    lib: object(expression: "HEAD:lib") { ...entries }
+    auto: object(expression: "HEAD:auto") { ...entries }
+  }
+}
+fragment entries on GitObject {
+  ... on Tree { entries { name } }
+}
+"""
+
+    _LINK_NEXT_RE = re.compile(
+        r'<https://api\.github\.com(/[^>]*)>;\s*rel="next"'
+    )
+
+    def __init__(
+        self, direct=False, cache_file=None, cache_ttl=None,
+    ):
+        self.direct = direct
+        self.cache_file = cache_file
+        # gh CLI response cache lifetime (e.g. "1h"),
+        # passed as gh api --cache; None disables it
+        self.cache_ttl = cache_ttl
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._token = None
+        # One connection per thread: get_file_tree
+        # fetches subdirectories concurrently
+        self._local = threading.local()
+        # Direct-mode conditional GET cache:
+        # path -> {"etag": ..., "body": ...}
+        self._etags = None
+        self._etags_dirty = False
+        # Guards the ETag cache and hit/miss counters,
+        # which main()'s worker threads share
+        self._cache_lock = threading.Lock()
+        # (full_name, path, branch) -> decoded content
+        self._contents = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build a client configured from OMNIBOR_GH_* variables."""
+        return cls(
+            direct=os.environ.get("OMNIBOR_GH_DIRECT") == "1",
+            cache_file=os.environ.get("OMNIBOR_GH_CACHE"),
+            cache_ttl=os.environ.get("OMNIBOR_GH_CACHE_TTL"),
+        )
 
     def api(self, endpoint):
-        """Call the GitHub API via gh CLI. Returns parsed JSON."""
+        """Call the GitHub API. Returns parsed JSON or None."""
+        if self.direct:
+            return self._http_api(endpoint)
         result = subprocess.run(
-            ["gh", "api", endpoint, "--paginate"],
-            capture_output=True, text=True,
+            ["gh", "api", endpoint, "--paginate"]
+            + self._gh_cache_args(),
+            capture_output=True,
         )
         if result.returncode != 0:
             return None
+        # json.loads takes the raw bytes directly; no
+        # text-mode decode/newline pass over the output
         try:
             return json.loads(result.stdout)
-        except json.JSONDecodeError:
+        except ValueError:
+            return None
+
+    def _auth_token(self):
+        """Return the gh CLI token ("" if unavailable), once."""
+        if self._token is None:
+            try:
+                result = subprocess.run(
+                    ["gh", "auth", "token"],
+                    capture_output=True, text=True,
+                )
+            except OSError:
+                # No gh CLI: go unauthenticated
+                self._token = ""
+            else:
+                self._token = (
+                    result.stdout.strip()
+                    if result.returncode == 0 else ""
+                )
+        return self._token
+
+    def _http_get(self, path, accept=JSON_MEDIA_TYPE):
+        """GET path from the API host on this thread's connection.
+
+        Returns (status, link_header, body), or None if the
+        request fails twice (once on a reopened connection).
+        """
+        headers = {
+            "Accept": accept,
+            "User-Agent": self.USER_AGENT,
+        }
+        token = self._auth_token()
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        etags = self._etag_cache()
+        key = (
+            path if accept == self.JSON_MEDIA_TYPE
+            else f"{accept} {path}"
+        )
+        cached = etags.get(key)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        for _ in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = http.client.HTTPSConnection(
+                    self.API_HOST, timeout=30
+                )
+                self._local.conn = conn
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                status = resp.status
+                link = resp.getheader("Link", "")
+                etag = resp.getheader("ETag", "")
+                body = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                continue
+            if status == 304 and cached:
+                # Unchanged: no rate-limit cost
+                with self._cache_lock:
+                    self._cache_hits += 1
+                return 200, cached["link"], cached["body"]
+            with self._cache_lock:
+                self._cache_misses += 1
+                if status == 200 and etag:
+                    etags[key] = {
+                        "etag": etag, "link": link,
+                        "body": body.decode("utf-8", "replace"),
+                    }
+                    self._etags_dirty = True
+            return status, link, body
+        return None
+
+    def _gh_cache_args(self):
+        """Return the gh api --cache flag for cache_ttl, if set."""
+        return ["--cache", self.cache_ttl] if self.cache_ttl else []
+
+    def cache_stats(self):
+        """Return direct-mode conditional GET hits and misses."""
+        with self._cache_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+            }
+
+    def _http_raw(self, endpoint):
+        """Fetch a contents endpoint as raw file text, or None.
+
+        The raw media type skips the JSON envelope and
+        base64 encoding of the contents API.
+        """
+        res = self._http_get(
+            "/" + endpoint.lstrip("/"),
+            accept=self.RAW_MEDIA_TYPE,
+        )
+        if res is None or res[0] != 200:
+            return None
+        body = res[2]
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        return body
+
+    def _etag_cache(self):
+        """Return the conditional GET cache, loading cache_file once."""
+        with self._cache_lock:
+            if self._etags is None:
+                data = None
+                if self.cache_file and Path(
+                    self.cache_file
+                ).exists():
+                    data = JsonCache.read(Path(self.cache_file))
+                self._etags = (
+                    data if isinstance(data, dict) else {}
+                )
+            return self._etags
+
+    def save_cache(self):
+        """Write the conditional GET cache to cache_file, if changed."""
+        with self._cache_lock:
+            if self.cache_file and self._etags_dirty:
+                JsonCache.write(
+                    Path(self.cache_file), self._etags
+                )
+                self._etags_dirty = False
+
+    def _http_api(self, endpoint):
+        """api() over HTTPS, following Link pagination like --paginate."""
+        path = "/" + endpoint.lstrip("/")
+        merged = None
+        while path:
+            res = self._http_get(path)
+            if res is None or res[0] != 200:
+                return None
+            _, link, body = res
+            try:
+                page = json.loads(body)
+            except json.JSONDecodeError:
+                return None
+            if merged is None:
+                merged = page
+            elif isinstance(merged, list) and isinstance(
+                page, list
+            ):
+                merged.extend(page)
+            else:
+                break
+            match = self._LINK_NEXT_RE.search(link)
+            path = match.group(1) if match else None
+        return merged
+
+    def graphql(self, query, variables=None):
+        """Run a GraphQL query via gh CLI. Returns the data dict."""
+        cmd = ["gh", "api", "graphql", "-f", f"query={query}"]
+        for name, value in (variables or {}).items():
+            cmd += ["-f", f"{name}={value}"]
+        cmd += self._gh_cache_args()
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            return None
+        try:
+            payload = json.loads(result.stdout)
+        except ValueError:
+            return None
+        if not isinstance(payload, dict) or payload.get(
+            "errors"
+        ):
+            return None
+        return payload.get("data")
+
+    def get_repo_bundle(self, full_name):
+        """Fetch repo info, languages and file tree in one call.
+
+        Returns {"info", "languages", "tree"} shaped like
+        get_repo_info(), get_languages() and get_file_tree(),
+        or None on failure.
+        """
+        owner, _, name = full_name.partition("/")
+        data = self.graphql(
+            self._BUNDLE_QUERY,
+            {"owner": owner, "name": name},
+        )
+        repo = (data or {}).get("repository")
+        if not repo:
             return None
+        branch = repo.get("defaultBranchRef") or {}
+        lang = repo.get("primaryLanguage") or {}
+        tree = [
+            entry["name"]
+            for entry in (
+                repo.get("root") or {}
+            ).get("entries", [])
+        ]
+        for subdir in self.SCAN_SUBDIRS:
+            for entry in (
+                repo.get(subdir) or {}
+            ).get("entries", []):
+                tree.append(f"{subdir}/{entry['name']}")
+        return {
+            "info": {
+                "fullName": repo["nameWithOwner"],
+                "description": repo.get("description", ""),
+                "url": repo["url"],
+                "stargazersCount": repo.get(
+                    "stargazerCount", 0
+                ),
+                "defaultBranch": branch.get("name", "main"),
+                "language": lang.get("name", ""),
+            },
+            "languages": {
+                edge["node"]["name"]: edge["size"]
+                for edge in (
+                    repo.get("languages") or {}
+                ).get("edges", [])
+            },
+            "tree": tree,
+        }
+
+    def fetch_repo_bundle(self, name_or_url):
+        """Resolve a repo and its file tree, in one call if possible.
+
+        A URL or owner/repo goes through get_repo_bundle();
+        a bare name (or a failed bundle) falls back to
+        get_repo_info() + get_file_tree(). Returns
+        {"info", "languages", "tree"} ({"info", "tree"}
+        on the fallback) or None if the repo is not found.
+        """
+        full_name = self.parse_github_url(name_or_url)
+        if not full_name and "/" in name_or_url:
+            full_name = name_or_url
+        if full_name:
+            bundle = self.get_repo_bundle(full_name)
+            if bundle:
+                return bundle
+
+        info = self.get_repo_info(name_or_url)
+        if not info:
+            return None
+        return {
+            "info": info,
+            "tree": self.get_file_tree(
+                info["fullName"], info["defaultBranch"]
+            ),
+        }
 
     def search_repos(self, query):
         """Search GitHub for repos by name. Returns top result."""
@@ -93,29 +430,34 @@ def search_repos(self, query):
             )
             return None
 
+        # One pass: per pool (C-ish repos, all repos) keep
+        # the first exact name match and the most-starred
+        # repo (first wins ties). C-ish repos win if any.
         c_langs = ("c", "c++", "")
-        c_repos = [
-            r for r in repos
-            if r.get(
-                "language", ""
-            ).lower() in c_langs
-        ]
-        candidates = c_repos if c_repos else repos
-
-        for r in candidates:
-            name = (
-                r["fullName"].split("/")[-1].lower()
+        wanted = query.lower()
+        exact_c = best_c = exact_any = best_any = None
+        for r in repos:
+            stars = r.get("stargazersCount", 0)
+            exact = (
+                r["fullName"].rpartition("/")[2].lower()
+                == wanted
             )
-            if name == query.lower():
-                return r
-
-        return sorted(
-            candidates,
-            key=lambda r: r.get(
-                "stargazersCount", 0
-            ),
-            reverse=True,
-        )[0]
+            if (
+                r.get("language", "").lower()
+                in c_langs
+            ):
+                if exact and exact_c is None:
+                    exact_c = r
+                if best_c is None or stars > best_c[0]:
+                    best_c = (stars, r)
+            if exact and exact_any is None:
+                exact_any = r
+            if best_any is None or stars > best_any[0]:
+                best_any = (stars, r)
+
+        if best_c is not None:
+            return exact_c or best_c[1]
+        return exact_any or best_any[1]
 
     def get_repo_info(self, name_or_url):
         """Get repository info. Accepts name, owner/repo, or URL."""
@@ -135,7 +477,18 @@ def get_repo_info(self, name_or_url):
         return self.search_repos(name_or_url)
 
     def get_file_tree(self, full_name, branch):
-        """Get the file tree (top-level + src/ + lib/ + auto/)."""
+        """Get the file tree (top-level + src/ + lib/ + auto/).
+
+        Tries a single recursive git tree request first and
+        falls back to listing the contents API directory by
+        directory if that fails or the tree is truncated.
+        """
+        files = self.get_file_tree_recursive(
+            full_name, branch
+        )
+        if files is not None:
+            return files
+
         contents = self.api(
             f"repos/{full_name}"
             f"/contents?ref={branch}"
@@ -145,13 +498,32 @@ def get_file_tree(self, full_name, branch):
 
         files = [item["name"] for item in contents]
 
-        for subdir in ("src", "lib", "auto"):
-            url = (
+        # Only list subdirectories the root actually has,
+        # and fetch them concurrently: each api() call is a
+        # gh subprocess round trip.
+        present = set(files)
+        subdirs = [
+            d for d in self.SCAN_SUBDIRS
+            if d in present
+        ]
+        if not subdirs:
+            return files
+
+        def list_subdir(subdir):
+            return self.api(
                 f"repos/{full_name}"
                 f"/contents/{subdir}"
                 f"?ref={branch}"
             )
-            sub = self.api(url)
+
+        with ThreadPoolExecutor(
+            max_workers=len(subdirs)
+        ) as pool:
+            listings = list(
+                pool.map(list_subdir, subdirs)
+            )
+
+        for subdir, sub in zip(subdirs, listings):
             if sub and isinstance(sub, list):
                 for item in sub:
                     files.append(
@@ -160,23 +532,67 @@ def get_file_tree(self, full_name, branch):
 
         return files
 
+    def get_file_tree_recursive(self, full_name, branch):
+        """Get the get_file_tree() listing from one git tree call.
+
+        Returns None if the request fails or GitHub
+        truncated the tree, so the caller can fall back.
+        """
+        tree = self.api(
+            f"repos/{full_name}/git/trees/{branch}"
+            "?recursive=1"
+        )
+        if (
+            not isinstance(tree, dict)
+            or tree.get("truncated")
+            or not isinstance(tree.get("tree"), list)
+        ):
+            return None
+
+        files = []
+        nested = {d: [] for d in self.SCAN_SUBDIRS}
+        for item in tree["tree"]:
+            top, sep, rest = item["path"].partition("/")
+            if not sep:
+                files.append(top)
+            elif top in nested and "/" not in rest:
+                nested[top].append(item["path"])
+        for subdir in self.SCAN_SUBDIRS:
+            files.extend(nested[subdir])
+        return files
+
     def get_file_content(
         self, full_name, path, branch
     ):
-        """Fetch a file's content (base64-decoded)."""
+        """Fetch a file's content (base64-decoded).
+
+        In direct mode the raw media type is tried first.
+        Results, including misses, are memoized per
+        (full_name, path, branch) for this client.
+        """
+        key = (full_name, path, branch)
+        if key in self._contents:
+            return self._contents[key]
         url = (
             f"repos/{full_name}/contents/{path}"
             f"?ref={branch}"
         )
+        if self.direct:
+            content = self._http_raw(url)
+            if content is not None:
+                self._contents[key] = content
+                return content
         data = self.api(url)
-        if not data or "content" not in data:
-            return None
-        try:
-            return base64.b64decode(
-                data["content"]
-            ).decode("utf-8", errors="replace")
-        except (ValueError, UnicodeDecodeError):
-            return None
+        content = None
+        if data and "content" in data:
+            try:
+                content = base64.b64decode(
+                    data["content"]
+                ).decode("utf-8", errors="replace")
+            except (ValueError, UnicodeDecodeError):
+                pass
+        self._contents[key] = content
+        return content
 
     def get_languages(self, full_name):
         """Get language byte counts from GitHub API."""
@@ -186,14 +602,25 @@ def get_languages(self, full_name):
 
     @staticmethod
     def parse_github_url(url_or_name):
-        """Parse a GitHub URL into owner/repo, or return None."""
-        match = re.search(
-            r"github\.com[:/]([^/]+)/([^/.]+)",
-            url_or_name,
-        )
-        if match:
-            return (
-                f"{match.group(1)}/{match.group(2)}"
+        """Parse a GitHub URL into owner/repo, or return None.
+
+        Finds the first "github.com:" or "github.com/"
+        followed by owner/repo; the repo name stops at the
+        next "/" or "." (so ".git" and "/tree/..." drop).
+        """
+        start = url_or_name.find("github.com")
+        while start >= 0:
+            rest = url_or_name[start + 10:]
+            if rest[:1] in (":", "/"):
+                owner, sep, tail = (
+                    rest[1:].partition("/")
+                )
+                repo = tail.partition("/")[0]
+                repo = repo.partition(".")[0]
+                if owner and sep and repo:
+                    return f"{owner}/{repo}"
+            start = url_or_name.find(
+                "github.com", start + 1
             )
         return None
 
@@ -216,6 +643,48 @@ def _normalize(data):
         }
 
 
+# ============================================================
+# File index
+# ============================================================
+
+class FileIndex:
+    """Read-only lookup structure over a repo file list.
+
+    Built once per repo and shared by the detectors:
+    exact-path membership via a frozenset, and by_top
+    mapping a top-level directory to the paths under it.
+    Iterates and measures like the original list.
+    """
+
+    def __init__(self, files):
+        self.files = list(files)
+        self.exact = frozenset(self.files)
+        by_top = {}
+        for f in self.files:
+            top, sep, _ = f.partition("/")
+            if sep:
+                by_top.setdefault(top, []).append(f)
+        self.by_top = by_top
+
+    @classmethod
+    def of(cls, files):
+        """Return files as a FileIndex, indexing a plain list."""
+        return files if isinstance(files, cls) else cls(files)
+
+    def __contains__(self, path):
+        return path in self.exact
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def has_dir(self, top):
+        """True if any path lies under the top-level dir."""
+        return top in self.by_top
+
+
 # ============================================================
 # Build system detection
 # ============================================================
@@ -227,9 +696,14 @@ def __init__(self, indicators=None):
         self.indicators = indicators or []
 
     def detect(self, files):
-        """Return the build system name for the given file list."""
+        """Return the build system name for the given file list.
+
+        Indicators are checked in priority order against a
+        FileIndex of the files, so each check is O(1).
+        """
+        present = FileIndex.of(files)
         for indicator, system in self.indicators:
-            if indicator in files:
+            if indicator in present:
                 return system
         return "unknown"
 
@@ -256,6 +730,30 @@ class DependencyAnalyzer:
     def __init__(self, known_deps=None, github=None):
         self.known_deps = known_deps or {}
         self.github = github or GitHubClient()
+        # flag_key -> ((needle, flag, apt_packages), ...)
+        self._needles = {}
+
+    def _needles_for(self, flag_key):
+        """Return the scan list for flag_key, built once.
+
+        Only deps that define a flag for flag_key are
+        kept, with their names pre-lowercased.
+        """
+        needles = self._needles.get(flag_key)
+        if needles is None:
+            needles = []
+            for dep_name, dep_info in (
+                self.known_deps.items()
+            ):
+                flag = dep_info.get(flag_key, "")
+                if flag:
+                    needles.append((
+                        dep_name.lower(), flag,
+                        dep_info.get("apt_packages", []),
+                    ))
+            needles = tuple(needles)
+            self._needles[flag_key] = needles
+        return needles
 
     def analyze(
         self, full_name, branch,
@@ -272,7 +770,7 @@ def analyze(
             return [], []
 
         config_file, flag_key = config
-        if config_file not in files:
+        if config_file not in FileIndex.of(files):
             return [], []
 
         content = self.github.get_file_content(
@@ -285,18 +783,12 @@ def analyze(
         apt_packages = []
         content_lower = content.lower()
 
-        for dep_name, dep_info in (
-            self.known_deps.items()
+        for needle, flag, pkgs in self._needles_for(
+            flag_key
         ):
-            flag = dep_info.get(flag_key, "")
-            if (
-                dep_name.lower() in content_lower
-                and flag
-            ):
+            if needle in content_lower:
                 flags.append(flag)
-                apt_packages.extend(
-                    dep_info.get("apt_packages", [])
-                )
+                apt_packages.extend(pkgs)
 
         return flags, list(set(apt_packages))
 
@@ -308,6 +800,13 @@ def analyze(
 class BinaryDetector:
     """Detects output binary paths from Makefiles and repo structure."""
 
+    _BIN_PROGRAMS_RE = re.compile(
+        r"bin_PROGRAMS\s*[+=]\s*(.+)"
+    )
+    _LIB_LTLIBRARIES_RE = re.compile(
+        r"lib_LTLIBRARIES\s*[+=]\s*(.+)"
+    )
+
     def __init__(self, github=None):
         self.github = github or GitHubClient()
 
@@ -316,6 +815,7 @@ def detect(
         build_system, files,
     ):
         """Guess the output binary paths."""
+        files = FileIndex.of(files)
         binaries = []
 
         makefiles = [
@@ -340,17 +840,15 @@ def detect(
 
         return binaries
 
-    @staticmethod
-    def _parse_makefile(content):
+    @classmethod
+    def _parse_makefile(cls, content):
         """Extract binaries from Makefile.am content."""
         binaries = []
-        pat_bin = r'bin_PROGRAMS\s*[+=]\s*(.+)'
-        for m in re.findall(pat_bin, content):
+        for m in cls._BIN_PROGRAMS_RE.findall(content):
             for prog in m.split():
                 binaries.append(prog.strip())
 
-        pat_lib = r'lib_LTLIBRARIES\s*[+=]\s*(.+)'
-        for m in re.findall(pat_lib, content):
+        for m in cls._LIB_LTLIBRARIES_RE.findall(content):
             for lib in m.split():
                 lib_name = lib.strip().replace(
                     ".la", ".so"
@@ -363,7 +861,7 @@ def _parse_makefile(content):
     @staticmethod
     def _fallback(repo_name, files):
         """Fallback binary detection from repo structure."""
-        if any(f.startswith("src/") for f in files):
+        if FileIndex.of(files).has_dir("src"):
             return [
                 f"src/.libs/{repo_name}",
                 f"src/{repo_name}",
@@ -456,12 +954,17 @@ def _unknown(_flags):
 # ============================================================
 
 class ConfigGenerator:
-    """Generates and writes config.yaml entries."""
+    """Generates and writes config.yaml entries.
+
+    opener replaces the builtin open() for config.yaml
+    reads and writes (e.g. an in-memory file in tests).
+    """
 
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, opener=None):
         self.config_path = config_path or (
             Path(__file__).parent / "config.yaml"
         )
+        self.opener = opener or open
 
     def generate_entry(
         self, repo_info, build_steps,
@@ -486,7 +989,7 @@ def generate_entry(
 
     def write_entry(self, repo_name, entry):
         """Append the repo entry to config.yaml."""
-        with open(
+        with self.opener(
             self.config_path, "r", encoding="utf-8"
         ) as f:
             config = yaml.safe_load(f)
@@ -499,11 +1002,11 @@ def write_entry(self, repo_name, entry):
 
         config["repos"][repo_name] = entry
 
-        with open(
+        with self.opener(
             self.config_path, "w", encoding="utf-8"
         ) as f:
             yaml.dump(
-                config, f,
+                config, f, Dumper=SafeDumper,
                 default_flow_style=False,
                 sort_keys=False, width=120,
             )
@@ -513,9 +1016,12 @@ def write_entry(self, repo_name, entry):
         )
 
     @staticmethod
-    def create_output_dirs(repo_name):
-        """Create the output directory structure."""
-        base = Path(__file__).parent.parent
+    def create_output_dirs(repo_name, base=None):
+        """Create the output directory structure.
+
+        base defaults to the project root.
+        """
+        base = Path(base or Path(__file__).parent.parent)
         dirs = [
             base / "output" / "omnibor" / repo_name,
             base / "output" / "spdx" / repo_name,
@@ -528,9 +1034,15 @@ def create_output_dirs(repo_name):
             print(f"  [DIR] {d}")
 
     @staticmethod
-    def get_repo_stats(full_name, github):
-        """Get lines of code estimate from GitHub."""
-        data = github.get_languages(full_name)
+    def get_repo_stats(full_name, github, languages=None):
+        """Get lines of code estimate from GitHub.
+
+        languages is the byte-count map from a repo bundle;
+        get_languages() is only called when it is missing.
+        """
+        data = languages
+        if data is None:
+            data = github.get_languages(full_name)
         if not data:
             return ""
         total_bytes = sum(data.values())
@@ -556,6 +1068,9 @@ class RepoDiscovery:
     Composes GitHubClient, BuildSystemDetector,
     DependencyAnalyzer, BinaryDetector,
     BuildStepGenerator, and ConfigGenerator.
+
+    opener replaces the builtin open() for reading the
+    Dockerfile at dockerfile_path.
     """
 
     def __init__(
@@ -567,9 +1082,16 @@ def __init__(
         binary_detector=None,
         step_generator=None,
         config_generator=None,
+        dockerfile_path=None,
+        opener=None,
     ):
         self.github = github or GitHubClient()
         self.data = data_loader or DataLoader()
+        self.dockerfile_path = dockerfile_path or (
+            Path(__file__).parent.parent
+            / "docker" / "Dockerfile"
+        )
+        self.opener = opener or open
 
         indicators = self.data.load_build_systems()
         deps = self.data.load_dependencies()
@@ -590,30 +1112,62 @@ def __init__(
             ConfigGenerator()
         )
 
-    @staticmethod
+    # Descriptions longer than DESC_MAX are cut to fit,
+    # ending in DESC_ELLIPSIS
+    DESC_MAX = 60
+    DESC_ELLIPSIS = "..."
+
+    @classmethod
+    @functools.lru_cache(maxsize=512)
     def build_description(
-        repo_info, stats, repo_name
+        cls, description, stats, repo_name
     ):
-        """Build a description string from repo info."""
-        desc_parts = []
-        if repo_info.get("description"):
-            desc = repo_info["description"]
-            if len(desc) > 60:
-                desc = desc[:57] + "..."
-            desc_parts.append(desc)
+        """Build a description string from a repo's own.
+
+        Takes the description text rather than the repo
+        info dict so the result can be memoized.
+        """
+        desc = description or ""
+        if len(desc) > cls.DESC_MAX:
+            desc = (
+                desc[:cls.DESC_MAX - len(cls.DESC_ELLIPSIS)]
+                + cls.DESC_ELLIPSIS
+            )
         if stats:
-            desc_parts.append(f"({stats})")
-        return (
-            " ".join(desc_parts)
-            if desc_parts
-            else repo_name
-        )
+            return (
+                f"{desc} ({stats})" if desc
+                else f"({stats})"
+            )
+        return desc or repo_name
 
 
 # ============================================================
 # CLI entry point
 # ============================================================
 
+_DOCKERFILE_SPLIT_RE = re.compile(r"[\s\\]+")
+
+
+@functools.lru_cache(maxsize=4)
+def _dockerfile_packages(dockerfile_path, opener=open):
+    """Return the words of a Dockerfile as a set, parsed once.
+
+    Version pins (pkg=1.2) are stripped so a package
+    name is found whether or not it is pinned. Empty if
+    the Dockerfile does not exist.
+    """
+    try:
+        with opener(dockerfile_path) as f:
+            text = f.read()
+    except FileNotFoundError:
+        return frozenset()
+    return frozenset(
+        word.partition("=")[0]
+        for word in _DOCKERFILE_SPLIT_RE.split(text)
+        if word
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=(
@@ -644,13 +1198,16 @@ def main():
     )
     print(f"{'='*60}\n")
 
-    discovery = RepoDiscovery()
+    discovery = RepoDiscovery(
+        github=GitHubClient.from_env()
+    )
 
     # Step 1: Find repo
     print("[1/6] Searching GitHub...")
-    repo_info = discovery.github.get_repo_info(
+    bundle = discovery.github.fetch_repo_bundle(
         args.repo
     )
+    repo_info = bundle["info"] if bundle else None
     if not repo_info:
         print(
             "[ERROR] Could not find repository "
@@ -671,15 +1228,15 @@ def main():
 
     # Step 2: File tree
     print("\n[2/6] Inspecting repository contents...")
-    files = discovery.github.get_file_tree(
-        full_name, branch
-    )
+    files = bundle["tree"]
     if not files:
         print(
             "[ERROR] Could not read repository "
             "file tree"
         )
         sys.exit(1)
+    # Index once; the detectors below all probe it
+    files = FileIndex(files)
     print(
         f"  Found {len(files)} files in "
         "top-level + src/ + lib/"
@@ -690,41 +1247,58 @@ def main():
     build_system = discovery.detector.detect(files)
     print(f"  Build system: {build_system}")
 
-    # Step 4: Dependencies
-    print("\n[4/6] Analyzing dependencies...")
-    flags, apt_packages = (
-        discovery.analyzer.analyze(
-            full_name, branch, build_system, files
+    # Steps 5 and 6 make their own GitHub requests and
+    # need nothing from step 4, so start the binary scan
+    # and repo stats now and overlap them with it
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        binaries_future = pool.submit(
+            discovery.binary_detector.detect,
+            full_name, repo_name, build_system, files,
         )
-    )
-    if flags:
-        flags_str = " ".join(flags)
-        print(f"  Configure flags: {flags_str}")
-    else:
-        print(
-            "  No optional dependency flags detected"
-        )
-    if apt_packages:
-        pkgs_str = ", ".join(sorted(apt_packages))
-        print(
-            f"  Required apt packages: {pkgs_str}"
+        stats_future = pool.submit(
+            discovery.config.get_repo_stats,
+            full_name, discovery.github,
+            bundle.get("languages"),
         )
 
-    # Step 5: Binaries
-    print("\n[5/6] Identifying output binaries...")
-    binaries = discovery.binary_detector.detect(
-        full_name, repo_name, build_system, files
-    )
-    for b in binaries:
-        print(f"  - {b}")
+        # Step 4: Dependencies
+        print("\n[4/6] Analyzing dependencies...")
+        flags, apt_packages = (
+            discovery.analyzer.analyze(
+                full_name, branch, build_system, files
+            )
+        )
+        if flags:
+            flags_str = " ".join(flags)
+            print(f"  Configure flags: {flags_str}")
+        else:
+            print(
+                "  No optional dependency flags detected"
+            )
+        if apt_packages:
+            pkgs_str = ", ".join(sorted(apt_packages))
+            print(
+                f"  Required apt packages: {pkgs_str}"
+            )
 
-    # Step 6: Config
-    print("\n[6/6] Generating config entry...")
-    stats = discovery.config.get_repo_stats(
-        full_name, discovery.github
-    )
+        # Step 5: Binaries
+        print("\n[5/6] Identifying output binaries...")
+        binaries = binaries_future.result()
+        for b in binaries:
+            print(f"  - {b}")
+
+        # Step 6: Config
+        print("\n[6/6] Generating config entry...")
+        stats = stats_future.result()
+    discovery.github.save_cache()
+    cache = discovery.github.cache_stats()
+    if cache["hits"]:
+        print(
+            f"  GitHub cache: {cache['hits']} unchanged, "
+            f"{cache['misses']} fetched"
+        )
     description = discovery.build_description(
-        repo_info, stats, repo_name
+        repo_info.get("description"), stats, repo_name
     )
     build_steps = discovery.steps.generate(
         build_system, flags
@@ -744,7 +1318,7 @@ def main():
     )
     print(f"{sep}\n")
     yaml_str = yaml.dump(
-        {repo_name: entry},
+        {repo_name: entry}, Dumper=SafeDumper,
         default_flow_style=False,
         sort_keys=False, width=120,
     )
@@ -754,16 +1328,12 @@ def main():
         print(f"{sep}")
         print("  Required Dockerfile additions:")
         print(f"{sep}\n")
-        dockerfile_path = (
-            Path(__file__).parent.parent
-            / "docker" / "Dockerfile"
+        existing_pkgs = set(apt_packages) & (
+            _dockerfile_packages(
+                discovery.dockerfile_path,
+                discovery.opener,
+            )
         )
-        existing_pkgs = set()
-        if dockerfile_path.exists():
-            df_content = dockerfile_path.read_text()
-            for pkg in apt_packages:
-                if pkg in df_content:
-                    existing_pkgs.add(pkg)
 
         new_pkgs = [
             p for p in sorted(apt_packages)
@@ -71,12 +71,25 @@ def main(binary_path, out_dir):
         ["${" + f + "}" for f in fields]
     )
 
+    # Libraries next to the binary come from the build
+    # tree, not from a dpkg-installed package.
+    build_dir = os.path.dirname(
+        os.path.abspath(binary_path)
+    ) + os.sep
+
     results = {}
-    for soname, info in sorted(libs.items()):
+    for soname, info in libs.items():
         real_path = os.path.realpath(info["path"])
         pkg = None
         # Try real path first, then original path
-        for try_path in [real_path, info["path"]]:
+        # (only once when they are identical)
+        if os.path.abspath(info["path"]).startswith(build_dir):
+            try_paths = []
+        elif real_path == info["path"]:
+            try_paths = [real_path]
+        else:
+            try_paths = [real_path, info["path"]]
+        for try_path in try_paths:
             try:
                 dpkg_out = subprocess.check_output(
                     ["dpkg", "-S", try_path],
@@ -147,7 +160,7 @@ def main(binary_path, out_dir):
     output = {
         "binary": binary_path,
         "direct_needed": sorted(needed),
-        "dynamic_libs": results,
+        "dynamic_libs": dict(sorted(results.items())),
         "libcurl_needed": sorted(libcurl_needed),
     }
 
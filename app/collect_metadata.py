@@ -36,7 +36,7 @@ def main(treedb_path, repos_dir, out_dir):
     file_to_pkg = {}
     failed = []
 
-    for real_path in sorted(unique_reals):
+    for real_path in unique_reals:
         try:
             out = subprocess.check_output(
                 ["dpkg", "-S", real_path],
@@ -49,6 +49,8 @@ def main(treedb_path, repos_dir, out_dir):
         except subprocess.CalledProcessError:
             failed.append(real_path)
 
+    # Sort only for stable output/display
+    failed.sort()
     print(f"Resolved to dpkg packages: {len(file_to_pkg)}")
     print(f"Failed to resolve: {len(failed)}")
     for f in failed[:10]:
@@ -23,13 +23,17 @@
     - DataLoader: main facade composing the above
 """
 
+import contextlib
 import json
 import logging
+import os
+import re
 import time
 import urllib.request
 import urllib.error
 from datetime import datetime, timezone
 from pathlib import Path
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +42,22 @@
     "debian_unstable", "debian_13", "debian_14",
     "ubuntu_24_04", "ubuntu_22_04",
 )
+# Precomputed filters for RepologyResolver.find_dev_package:
+# a cheap first-token check rejects most non-Debian repos
+# before the anchored prefix regex runs.
+_DEBIAN_FIRST_TOKENS = frozenset(
+    r.partition("_")[0] for r in REPOLOGY_DEBIAN_REPOS
+)
+_DEBIAN_PREFIX_RE = re.compile(
+    "|".join(re.escape(r) for r in REPOLOGY_DEBIAN_REPOS)
+)
+
+# Shared read-only fallback for cache files without _meta
+_EMPTY_META = MappingProxyType({})
+
+# Parsed cache files shared by DataLoaders that read through
+# the default JsonCache: path -> (st_mtime_ns, value)
+_SHARED_PARSED = {}
 
 
 # ============================================================
@@ -117,18 +137,24 @@ def read(path):
 
     @staticmethod
     def write(path, data):
-        """Write data to a JSON file atomically."""
+        """Write data to a JSON file atomically.
+
+        Serializes once and issues a single write, then
+        fsyncs the temp file before renaming it into place
+        so a crash never leaves a truncated cache behind.
+        """
         path.parent.mkdir(parents=True, exist_ok=True)
         tmp = path.with_suffix(".tmp")
+        blob = (
+            json.dumps(
+                data, indent=2, sort_keys=False,
+            ) + "\n"
+        ).encode("utf-8")
         try:
-            with open(
-                tmp, "w", encoding="utf-8"
-            ) as fh:
-                json.dump(
-                    data, fh,
-                    indent=2, sort_keys=False,
-                )
-                fh.write("\n")
+            with open(tmp, "wb") as fh:
+                fh.write(blob)
+                fh.flush()
+                os.fsync(fh.fileno())
             tmp.replace(path)
         except OSError as exc:
             logger.warning(
@@ -137,13 +163,17 @@ def write(path, data):
             if tmp.exists():
                 tmp.unlink()
 
+    @staticmethod
+    def meta(data):
+        """Return the _meta mapping of cached data (read-only if absent)."""
+        if not data:
+            return _EMPTY_META
+        return data.get("_meta") or _EMPTY_META
+
     @staticmethod
     def age_days(data):
         """Return the age of cached data in days, or None."""
-        meta = (
-            data.get("_meta", {}) if data else {}
-        )
-        ts = meta.get("last_updated")
+        ts = JsonCache.meta(data).get("last_updated")
         if not ts:
             return None
         try:
@@ -174,9 +204,10 @@ def find_dev_package(self, repology_data):
 
         for entry in repology_data:
             repo = entry.get("repo", "")
-            if not any(
-                repo.startswith(r)
-                for r in REPOLOGY_DEBIAN_REPOS
+            if (
+                repo.partition("_")[0]
+                not in _DEBIAN_FIRST_TOKENS
+                or not _DEBIAN_PREFIX_RE.match(repo)
             ):
                 continue
 
@@ -262,29 +293,65 @@ def __init__(
         )
         self.resolver = resolver or RepologyResolver()
         self.cache = cache or JsonCache()
+        # Parsed cache files: path -> (st_mtime_ns, value).
+        # With the default JsonCache the parse depends only
+        # on the file, so loaders share one table.
+        self._parsed = (
+            _SHARED_PARSED if cache is None else {}
+        )
+        # Lowercase-key index for lookup_dependency
+        self._lc_index = {}
+        self._lc_source = None
+        self._lc_size = 0
+        # Repology results not yet written to
+        # dependencies.json (see batch())
+        self._pending = {}
+        self._batch_depth = 0
+
+    def _read_cached(self, path, derive):
+        """Read path via the cache and memoize derive(data).
+
+        The derived value is reused until the file's mtime
+        changes. Returns None if the file cannot be read.
+        """
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        hit = self._parsed.get(path)
+        if mtime is not None and hit and hit[0] == mtime:
+            return hit[1]
+
+        data = self.cache.read(path)
+        if data is None:
+            return None
+        value = derive(data)
+        if mtime is not None:
+            self._parsed[path] = (mtime, value)
+        return value
 
     def load_build_systems(self, refresh=False):
         """Load build system indicators.
 
         Returns list of (filename, system_type) tuples
-        in priority order.
+        in priority order. The parsed indicators are
+        cached until build_systems.json's mtime changes.
         """
-        data = self.cache.read(
-            self.build_systems_file
+        indicators = self._read_cached(
+            self.build_systems_file,
+            lambda data: tuple(
+                (entry["file"], entry["system"])
+                for entry in data.get("indicators", [])
+                if "file" in entry and "system" in entry
+            ),
         )
-        if data is None:
+        if indicators is None:
             logger.error(
                 "No build_systems.json found — "
                 "using empty indicator list"
             )
             return []
-
-        indicators = data.get("indicators", [])
-        return [
-            (entry["file"], entry["system"])
-            for entry in indicators
-            if "file" in entry and "system" in entry
-        ]
+        return list(indicators)
 
     def load_dependencies(self, refresh=False):
         """Load dependency metadata.
@@ -292,7 +359,23 @@ def load_dependencies(self, refresh=False):
         If refresh=True and cache is stale, fetches
         from Repology.
         Returns dict mapping dep_name -> dep_info.
+        Without refresh, the parsed mapping is cached
+        until dependencies.json's mtime changes; treat
+        it as read-only.
         """
+        if not refresh:
+            libraries = self._read_cached(
+                self.dependencies_file,
+                lambda data: data.get("libraries", {}),
+            )
+            if libraries is None:
+                logger.error(
+                    "No dependencies.json found — "
+                    "using empty dependency map"
+                )
+                return {}
+            return libraries
+
         data = self.cache.read(
             self.dependencies_file
         )
@@ -303,15 +386,14 @@ def load_dependencies(self, refresh=False):
             )
             return {}
 
-        max_age = data.get(
-            "_meta", {}
-        ).get("cache_max_age_days", 7)
-
-        if refresh:
-            data = self.refresh_all(data, max_age)
-            self.cache.write(
-                self.dependencies_file, data
-            )
+        max_age = JsonCache.meta(data).get(
+            "cache_max_age_days", 7
+        )
+        data = self.refresh_all(data, max_age)
+        self.cache.write(
+            self.dependencies_file, data
+        )
+        self._parsed.pop(self.dependencies_file, None)
 
         return data.get("libraries", {})
 
@@ -329,9 +411,15 @@ def lookup_dependency(self, dep_name, deps=None):
             return deps[dep_name]
 
         # Case-insensitive match
-        for key, val in deps.items():
-            if key.lower() == dep_name.lower():
-                return val
+        real_key = self._lowercase_index(deps).get(
+            dep_name.lower()
+        )
+        if real_key is not None:
+            return deps[real_key]
+
+        pending = self._pending.get(dep_name)
+        if pending is not None:
+            return pending
 
         # On-demand Repology lookup
         logger.info(
@@ -344,19 +432,79 @@ def lookup_dependency(self, dep_name, deps=None):
         if new_entry is None:
             return None
 
-        # Persist to cache
+        # Persist to cache (deferred inside batch())
+        self._pending[dep_name] = new_entry
+        if not self._batch_depth:
+            self.flush()
+
+        return new_entry
+
+    def lookup_many(self, dep_names, deps=None):
+        """Look up several dependencies in one batch.
+
+        Returns dict mapping each name to its dep_info
+        (or None). Newly resolved entries are written to
+        dependencies.json once, at the end.
+        """
+        if deps is None:
+            deps = self.load_dependencies()
+        with self.batch():
+            return {
+                name: self.lookup_dependency(name, deps)
+                for name in dep_names
+            }
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defer dependency cache writes until exit.
+
+        Entries resolved by lookup_dependency() inside
+        the block are flushed with a single rewrite of
+        dependencies.json. Blocks may be nested.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def flush(self):
+        """Write pending Repology results to the cache.
+
+        Returns the number of entries persisted.
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
         full_data = self.cache.read(
             self.dependencies_file
         )
-        if full_data and "libraries" in full_data:
-            full_data["libraries"][dep_name] = (
-                new_entry
-            )
-            self.cache.write(
-                self.dependencies_file, full_data
-            )
-
-        return new_entry
+        if not full_data or "libraries" not in full_data:
+            return 0
+        full_data["libraries"].update(pending)
+        self.cache.write(
+            self.dependencies_file, full_data
+        )
+        self._parsed.pop(
+            self.dependencies_file, None
+        )
+        return len(pending)
+
+    def _lowercase_index(self, deps):
+        """Return {key.lower(): key} for deps, rebuilt on change."""
+        if (
+            deps is not self._lc_source
+            or len(deps) != self._lc_size
+        ):
+            index = {}
+            for key in deps:
+                index.setdefault(key.lower(), key)
+            self._lc_index = index
+            self._lc_source = deps
+            self._lc_size = len(deps)
+        return self._lc_index
 
     def refresh_all(self, deps_data, max_age_days=7):
         """Refresh all dependencies from Repology if stale."""
@@ -28,24 +28,234 @@
 
 Classes:
 
+    - ArtifactTable: column-oriented classified artifacts
     - AdgParser: reads treedb and classifies artifacts
     - ComponentResolver: maps artifacts to named components
     - SpdxEmitter: produces SPDX 2.3 JSON from resolved data
     - AdgSpdxGenerator: facade orchestrating the pipeline
+
+Functions:
+
+    - compact_doc: optional JSONH packing of the homogeneous
+      "files" and "relationships" arrays (revived by
+      spdx_visualize.revive_compact)
 """
 
 import argparse
+import functools
+import gzip
+import itertools
 import json
+import os
 import re
+import sys
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 
+# Suffixes (lowercased) counted as source files in the SBOM
+_SOURCE_EXTS = frozenset({
+    ".c", ".h", ".s", ".inc",
+    ".cc", ".cpp", ".cxx", ".hpp",
+})
+
+# Relationship types repeated across every emitted record;
+# interned so all records share one object per value
+_REL_DESCRIBES = sys.intern("DESCRIBES")
+_REL_DYNAMIC_LINK = sys.intern("DYNAMIC_LINK")
+_REL_STATIC_LINK = sys.intern("STATIC_LINK")
+_REL_BUILD_TOOL_OF = sys.intern("BUILD_TOOL_OF")
+_REL_CONTAINS = sys.intern("CONTAINS")
+
+
+# ============================================================
+# Compact (JSONH) layout
+# ============================================================
+
+# Arrays whose entries share one shape and are packed by
+# compact_doc(): [N, key1..keyN, row1 values, row2 values...]
+COMPACT_ARRAYS = ("files", "relationships")
+
+
+def _jsonh_pack(rows):
+    """Pack same-keyed dicts into a flat JSONH list.
+
+    Returns None if the rows do not share one key set,
+    or have no keys (the row count would be lost).
+    """
+    if not rows or not rows[0]:
+        return None
+    keys = list(rows[0])
+    packed = [len(keys), *keys]
+    for row in rows:
+        if len(row) != len(keys):
+            return None
+        try:
+            packed.extend([row[k] for k in keys])
+        except KeyError:
+            return None
+    return packed
+
+
+def compact_doc(doc):
+    """Return a shallow copy of doc with COMPACT_ARRAYS packed.
+
+    The result is not valid SPDX; consumers must revive it
+    (see spdx_visualize.revive_compact) before use. Arrays
+    whose entries do not share one shape are left as-is.
+    """
+    out = dict(doc)
+    for key in COMPACT_ARRAYS:
+        packed = _jsonh_pack(doc.get(key, []))
+        if packed is not None:
+            out[key] = packed
+    return out
+
+
 # ============================================================
 # ADG Parser
 # ============================================================
 
+class _Missing:
+    """build_cmd placeholder for a treedb entry without one."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __reduce__(self):
+        # Unpickle to the module singleton so identity
+        # checks survive ProcessPoolExecutor round trips
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
+class ArtifactTable:
+    """Column-oriented list of classified artifacts.
+
+    Stores sha1, file_path and build_cmd in parallel
+    lists instead of one dict per artifact. Iterating
+    or indexing yields row dicts with keys sha1,
+    file_path and build_cmd (only when present), and
+    slicing yields a list of them, so callers written
+    against list-of-dicts keep working.
+
+    Lowercase hex sha1s are kept as 20-byte digests in
+    the sha1 column (less than half the memory of a
+    40-char str) and hex-encoded again in row dicts;
+    any other key is stored unchanged.
+    """
+
+    __slots__ = ("sha1", "file_path", "build_cmd")
+
+    def __init__(self):
+        self.sha1 = []
+        self.file_path = []
+        self.build_cmd = []
+
+    @staticmethod
+    def _pack_sha1(sha1):
+        if len(sha1) == 40 and sha1 == sha1.lower():
+            try:
+                digest = bytes.fromhex(sha1)
+            except ValueError:
+                return sha1
+            if len(digest) == 20:
+                return digest
+        return sha1
+
+    def append(self, sha1, file_path, build_cmd=_MISSING):
+        self.sha1.append(self._pack_sha1(sha1))
+        self.file_path.append(file_path)
+        self.build_cmd.append(build_cmd)
+
+    def __len__(self):
+        return len(self.sha1)
+
+    def extend(self, other):
+        """Append all rows of another ArtifactTable."""
+        self.sha1.extend(other.sha1)
+        self.file_path.extend(other.file_path)
+        self.build_cmd.extend(other.build_cmd)
+
+    def _row(self, i):
+        sha1 = self.sha1[i]
+        row = {
+            "sha1": (
+                sha1.hex() if type(sha1) is bytes
+                else sha1
+            ),
+            "file_path": self.file_path[i],
+        }
+        if self.build_cmd[i] is not _MISSING:
+            row["build_cmd"] = self.build_cmd[i]
+        return row
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [
+                self._row(j)
+                for j in range(len(self))[i]
+            ]
+        return self._row(range(len(self))[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+
+def _classify_entries(items, repos_prefix):
+    """Classify (sha1, treedb entry) pairs by category.
+
+    Module-level so ProcessPoolExecutor can pickle it.
+    Returns a dict of category -> ArtifactTable.
+    """
+    classified = {
+        "system_lib": ArtifactTable(),
+        "system_header": ArtifactTable(),
+        "project_source": ArtifactTable(),
+        "build_intermediate": ArtifactTable(),
+        "crt_object": ArtifactTable(),
+    }
+
+    for sha1, entry in items:
+        fp = entry.get("file_path", "")
+        if not fp:
+            continue
+
+        if fp.startswith("/usr/lib"):
+            base = fp.rpartition("/")[2]
+            if base.startswith("crt") and (
+                base.endswith(".o")
+            ):
+                category = "crt_object"
+            else:
+                # Shared libs, static libs,
+                # other objects
+                category = "system_lib"
+        elif fp.startswith("/usr/include"):
+            category = "system_header"
+        elif fp.startswith(repos_prefix):
+            if fp.endswith(".o"):
+                category = "build_intermediate"
+            else:
+                category = "project_source"
+        else:
+            # Other system files
+            category = "system_header"
+
+        classified[category].append(
+            sha1, fp, entry.get("build_cmd", _MISSING)
+        )
+
+    return classified
+
+
 class AdgParser:
     """Parse bomsh treedb and classify artifacts.
 
@@ -57,9 +267,23 @@ class AdgParser:
       - crt_object: C runtime objects (crt*.o)
     """
 
-    def __init__(self, bom_dir, repos_dir):
+    # One record per line of bomsh_hook_raw_logfile:
+    #   outfile: <sha1> path: <file_path>
+    # Matched as bytes to skip decoding non-matching lines.
+    _LOGFILE_RE = re.compile(
+        rb"^outfile:\s+([0-9a-f]{40})"
+        rb"\s+path:\s+(.+)$"
+    )
+
+    # Minimum treedb size before parse() fans out to
+    # worker processes when parallel=True; below this
+    # the process start-up cost outweighs the gain.
+    PARALLEL_THRESHOLD = 50_000
+
+    def __init__(self, bom_dir, repos_dir, parallel=False):
         self.bom_dir = Path(bom_dir)
         self.repos_dir = Path(repos_dir)
+        self.parallel = parallel
         self.meta_dir = (
             self.bom_dir / "metadata" / "bomsh"
         )
@@ -70,72 +294,46 @@ def parse(self):
         Keys: system_lib, system_header,
               project_source, build_intermediate,
               crt_object.
-        Each value is a list of dicts with keys:
-          sha1, file_path, build_cmd (if present).
+        Each value is an ArtifactTable whose rows are
+        dicts with keys: sha1, file_path, build_cmd
+        (if present).
+
+        With parallel=True, treedbs of at least
+        PARALLEL_THRESHOLD entries are classified in
+        worker processes.
         """
         treedb_path = (
             self.meta_dir / "bomsh_omnibor_treedb"
         )
-        treedb = json.loads(treedb_path.read_text())
-
-        classified = {
-            "system_lib": [],
-            "system_header": [],
-            "project_source": [],
-            "build_intermediate": [],
-            "crt_object": [],
-        }
-
-        for sha1, entry in treedb.items():
-            fp = entry.get("file_path", "")
-            if not fp:
-                continue
-
-            item = {
-                "sha1": sha1,
-                "file_path": fp,
-            }
-            if "build_cmd" in entry:
-                item["build_cmd"] = entry["build_cmd"]
-
-            if fp.startswith("/usr/lib"):
-                base = Path(fp).name
-                if base.startswith("crt") and (
-                    base.endswith(".o")
-                ):
-                    classified["crt_object"].append(
-                        item
-                    )
-                elif base.endswith(".so") or (
-                    ".so." in base
-                ):
-                    classified["system_lib"].append(
-                        item
-                    )
-                else:
-                    # Static libs, other objects
-                    classified["system_lib"].append(
-                        item
-                    )
-            elif fp.startswith("/usr/include"):
-                classified["system_header"].append(
-                    item
-                )
-            elif fp.startswith(str(self.repos_dir)):
-                if fp.endswith(".o"):
-                    classified[
-                        "build_intermediate"
-                    ].append(item)
-                else:
-                    classified[
-                        "project_source"
-                    ].append(item)
-            else:
-                # Other system files
-                classified["system_header"].append(
-                    item
-                )
-
+        # json accepts UTF-8 bytes directly, skipping the
+        # intermediate str copy of a potentially large file
+        treedb = json.loads(treedb_path.read_bytes())
+
+        repos_prefix = str(self.repos_dir)
+        items = treedb.items()
+        if (
+            not self.parallel
+            or len(treedb) < self.PARALLEL_THRESHOLD
+        ):
+            return _classify_entries(items, repos_prefix)
+
+        # Shard across worker processes; merging the
+        # shards in order keeps the serial row order
+        items = list(items)
+        workers = os.cpu_count() or 1
+        size = -(-len(items) // workers)
+        chunks = [
+            items[i:i + size]
+            for i in range(0, len(items), size)
+        ]
+        classified = _classify_entries((), repos_prefix)
+        with ProcessPoolExecutor(workers) as pool:
+            for part in pool.map(
+                _classify_entries, chunks,
+                itertools.repeat(repos_prefix),
+            ):
+                for category, table in part.items():
+                    classified[category].extend(table)
         return classified
 
     def load_doc_mapping(self):
@@ -145,26 +343,35 @@ def load_doc_mapping(self):
         )
         if not path.exists():
             return {}
-        return json.loads(path.read_text())
+        return json.loads(path.read_bytes())
+
+    def load_raw_logfile_hashes(self, basenames=None):
+        """Return dict: file_path -> build-time sha1.
 
-    def load_raw_logfile_hashes(self):
-        """Return dict: file_path -> build-time sha1."""
+        If basenames is a dict, it is filled in the same
+        pass with basename -> first file_path seen, so a
+        binary can be found by name without a scan.
+        """
         path = (
             self.meta_dir / "bomsh_hook_raw_logfile"
         )
         if not path.exists():
             return {}
         result = {}
-        for line in path.read_text(
-            errors="replace"
-        ).splitlines():
-            m = re.match(
-                r"^outfile:\s+([0-9a-f]{40})"
-                r"\s+path:\s+(.+)$",
-                line,
-            )
-            if m:
-                result[m.group(2)] = m.group(1)
+        match = self._LOGFILE_RE.match
+        # Stream the (possibly multi-GB) log line by line
+        with open(path, "rb", buffering=1 << 20) as f:
+            for line in f:
+                m = match(line.rstrip(b"\r\n"))
+                if m:
+                    fp = m.group(2).decode(
+                        "utf-8", errors="replace"
+                    )
+                    result[fp] = m.group(1).decode("ascii")
+                    if basenames is not None:
+                        basenames.setdefault(
+                            fp.rpartition("/")[2], fp
+                        )
         return result
 
 
@@ -180,9 +387,16 @@ class ComponentResolver:
     to identify runtime dependencies with full metadata.
     """
 
+    _UBUNTU_VER_RE = re.compile(r"ubuntu\s+([\d.]+)")
+    # Version suffixes stripped for CPE matching
+    _DFSG_RE = re.compile(r"[.+]dfsg.*")
+    _UBUNTU_REV_RE = re.compile(r"-\d+ubuntu.*")
+    _BUILD_REV_RE = re.compile(r"-\d+build.*")
+    _DEBIAN_REV_RE = re.compile(r"-\d+$")
+
     def __init__(self, metadata_path):
         self.metadata = json.loads(
-            Path(metadata_path).read_text()
+            Path(metadata_path).read_bytes()
         )
         self._dynamic_libs = None
 
@@ -190,12 +404,12 @@ def __init__(self, metadata_path):
     def distro(self):
         return self.metadata.get("distro", "unknown")
 
-    @property
+    @functools.cached_property
     def distro_codename(self):
         """Extract distro version for PURL qualifier."""
         d = self.distro.lower()
         # "Ubuntu 22.04.5 LTS" -> "ubuntu-22.04"
-        m = re.search(r"ubuntu\s+([\d.]+)", d)
+        m = self._UBUNTU_VER_RE.search(d)
         if m:
             # Use major.minor only
             parts = m.group(1).split(".")
@@ -218,10 +432,10 @@ def curl_version(self):
     def load_dynamic_libs(self, path):
         """Load dynamic_libs.json."""
         self._dynamic_libs = json.loads(
-            Path(path).read_text()
+            Path(path).read_bytes()
         )
 
-    def resolve_dynamic_components(self):
+    def resolve_dynamic_components(self, ordered=True):
         """Resolve dynamic libraries to components.
 
         Groups libraries by upstream source package.
@@ -229,6 +443,10 @@ def resolve_dynamic_components(self):
           name, version, supplier, homepage,
           dpkg_packages, architecture, purl, cpe23,
           sonames, direct (bool).
+
+        Components are sorted by source name unless
+        ordered=False, in which case they follow the
+        order of dynamic_libs.json.
         """
         if not self._dynamic_libs:
             return []
@@ -241,33 +459,30 @@ def resolve_dynamic_components(self):
         source_groups = {}
         for soname, info in libs.items():
             meta = info.get("metadata", {})
-            source = info.get("source", soname)
             if not meta.get("Version"):
                 continue
-            if source not in source_groups:
-                source_groups[source] = {
+            source = info.get("source", soname)
+            group = source_groups.get(source)
+            if group is None:
+                group = source_groups[source] = {
                     "meta": meta,
                     "sonames": [],
                     "direct": False,
                     "dpkg_packages": set(),
                 }
-            source_groups[source][
-                "sonames"
-            ].append(soname)
+            group["sonames"].append(soname)
             if info.get("direct"):
-                source_groups[source][
-                    "direct"
-                ] = True
+                group["direct"] = True
             dpkg = info.get("dpkg_package")
             if dpkg:
-                source_groups[source][
-                    "dpkg_packages"
-                ].add(dpkg)
+                group["dpkg_packages"].add(dpkg)
+
+        groups = source_groups.items()
+        if ordered:
+            groups = sorted(groups)
 
         components = []
-        for source, group in sorted(
-            source_groups.items()
-        ):
+        for source, group in groups:
             meta = group["meta"]
             version = meta.get("Version", "unknown")
             arch = meta.get(
@@ -309,18 +524,21 @@ def resolve_dynamic_components(self):
 
         return components
 
-    def _clean_version(self, version):
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _clean_version(version):
         """Strip epoch, dfsg, ubuntu suffixes for CPE."""
+        cls = ComponentResolver
         v = version
         # Remove epoch (e.g. "1:1.2.11...")
         if ":" in v:
             v = v.split(":", 1)[1]
         # Remove dfsg suffix
-        v = re.sub(r"[.+]dfsg.*", "", v)
+        v = cls._DFSG_RE.sub("", v)
         # Remove ubuntu/build suffix
-        v = re.sub(r"-\d+ubuntu.*", "", v)
-        v = re.sub(r"-\d+build.*", "", v)
-        v = re.sub(r"-\d+$", "", v)
+        v = cls._UBUNTU_REV_RE.sub("", v)
+        v = cls._BUILD_REV_RE.sub("", v)
+        v = cls._DEBIAN_REV_RE.sub("", v)
         return v
 
     def _make_purl(self, dpkg_pkg, version, arch):
@@ -332,14 +550,14 @@ def _make_purl(self, dpkg_pkg, version, arch):
             f"?arch={arch}&distro={distro}"
         )
 
+    # cpe:2.3:a:<vendor>:<product>:<version>:...; the
+    # source name serves as both vendor and product
+    _CPE_FMT = "cpe:2.3:a:{0}:{0}:{1}:*:*:*:*:*:*:*".format
+
     def _make_cpe(self, source, version):
         """Generate CPE 2.3 identifier."""
-        # Normalize vendor: use source name as vendor
-        vendor = source.replace("-", "_")
-        product = source.replace("-", "_")
-        return (
-            f"cpe:2.3:a:{vendor}:{product}"
-            f":{version}:*:*:*:*:*:*:*"
+        return self._CPE_FMT(
+            source.replace("-", "_"), version
         )
 
 
@@ -558,6 +776,7 @@ class SpdxEmitter:
     NAMESPACE_PREFIX = (
         "https://omnibor.io/omnibor-analysis"
     )
+    _GITOID_FMT = "gitoid:blob:sha1:{}".format
 
     def __init__(
         self, repo_name, repo_version,
@@ -586,9 +805,19 @@ def _next_spdx_id(self, prefix="Package"):
             f"-{self._spdx_id_counter}"
         )
 
-    def _sanitize_spdx_id(self, name):
-        """Sanitize a name for use in SPDX IDs."""
-        return re.sub(r"[^a-zA-Z0-9._-]", "-", name)
+    _SPDX_ID_INVALID_RE = re.compile(r"[^a-zA-Z0-9._-]")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _sanitize_spdx_id(name):
+        """Sanitize a name for use in SPDX IDs.
+
+        Cached: the same library names and file
+        basenames recur across packages and files.
+        """
+        return SpdxEmitter._SPDX_ID_INVALID_RE.sub(
+            "-", name
+        )
 
     # Directories that indicate vendored/embedded
     # third-party source code.
@@ -597,6 +826,16 @@ def _sanitize_spdx_id(self, name):
         "/thirdparty/", "/external/", "/contrib/",
     )
 
+    # Single-pass matcher for VENDORED_DIRS; group 1 is
+    # the first path component after the vendored dir.
+    _VENDORED_RE = re.compile(
+        "/(?:"
+        + "|".join(
+            re.escape(d.strip("/")) for d in VENDORED_DIRS
+        )
+        + ")/([^/]+)"
+    )
+
     # Regex for #define PREFIX_VERSION "x.y.z"
     # Captures (prefix, version_string)
     _SUB_VERSION_RE = re.compile(
@@ -622,24 +861,16 @@ def _detect_vendored_groups(self, project_files):
         """
         vendored = {}
         own = []
+        search = self._VENDORED_RE.search
         for art in project_files:
-            fp = art["file_path"]
-            matched = False
-            for vdir in self.VENDORED_DIRS:
-                idx = fp.find(vdir)
-                if idx < 0:
-                    continue
-                # Extract library name: first path
-                # component after the vendored dir
-                rest = fp[idx + len(vdir):]
-                lib = rest.split("/")[0]
-                if lib:
-                    vendored.setdefault(
-                        lib, []
-                    ).append(art)
-                    matched = True
-                    break
-            if not matched:
+            # Library name: first path component
+            # after the (leftmost) vendored dir
+            m = search(art["file_path"])
+            if m:
+                vendored.setdefault(
+                    m.group(1), []
+                ).append(art)
+            else:
                 own.append(art)
 
         # Split out sub-components
@@ -775,30 +1006,103 @@ def _detect_sub_component(
 
         return None
 
-    def emit(
+    @staticmethod
+    def _name_and_suffix(fp):
+        """Return (basename, lowercased suffix) of a path.
+
+        String-only equivalent of Path(fp).name and
+        Path(fp).suffix.lower().
+        """
+        name = fp[fp.rfind("/") + 1:]
+        dot = name.rfind(".")
+        if 0 < dot < len(name) - 1:
+            return name, name[dot:].lower()
+        return name, ""
+
+    @staticmethod
+    def _rel_path(fp):
+        """Drop the leading directory of an artifact path.
+
+        /workspace/repos/curl/lib/a.c -> repos/curl/lib/a.c
+        (relative paths drop their first two components).
+        """
+        if fp.startswith("/"):
+            head, sep, tail = fp.lstrip("/").partition("/")
+            return tail if sep else head
+        parts = fp.split("/")
+        if len(parts) > 2:
+            return "/".join(parts[2:])
+        return fp
+
+    @staticmethod
+    def _dynamic_package(comp, pkg_id):
+        """Build the SPDX package for a dynamic library."""
+        linkage = (
+            "direct" if comp.get("direct")
+            else "transitive"
+        )
+        sonames = comp.get("sonames", [])
+        dpkg_pkgs = comp.get("dpkg_packages", [])
+
+        dl = (
+            comp["homepage"]
+            if comp.get("homepage")
+            and comp["homepage"] != "NOASSERTION"
+            else "NOASSERTION"
+        )
+        pkg = {
+            "SPDXID": pkg_id,
+            "name": comp["name"],
+            "downloadLocation": dl,
+            "filesAnalyzed": False,
+            "primaryPackagePurpose": "LIBRARY",
+            "externalRefs": [],
+            "comment": (
+                f"Dynamically linked ({linkage}). "
+                f"sonames: {', '.join(sonames)}. "
+                f"dpkg: {', '.join(dpkg_pkgs)}"
+                f" ({comp.get('architecture', 'amd64')})"
+            ),
+        }
+
+        # PURL
+        if comp.get("purl"):
+            pkg["externalRefs"].append({
+                "referenceCategory": "PACKAGE-MANAGER",
+                "referenceType": "purl",
+                "referenceLocator": comp["purl"],
+            })
+
+        # CPE
+        if comp.get("cpe23"):
+            pkg["externalRefs"].append({
+                "referenceCategory": "SECURITY",
+                "referenceType": "cpe23Type",
+                "referenceLocator": comp["cpe23"],
+            })
+
+        # Add optional fields only when known
+        if comp.get("version"):
+            pkg["versionInfo"] = comp["version"]
+        supplier = comp.get("supplier", "")
+        if supplier and supplier != "NOASSERTION":
+            pkg["supplier"] = f"Organization: {supplier}"
+        hp = comp.get("homepage", "")
+        if hp and hp != "NOASSERTION":
+            pkg["homepage"] = hp
+        return pkg
+
+    def _emit_packages(
         self, components, project_files,
         doc_mapping, logfile_hashes,
         direct_only=False,
         static_only=False,
+        logfile_basenames=None,
     ):
-        """Generate SPDX 2.3 JSON dict.
+        """Build the document minus its source files.
 
-        Args:
-            components: list of resolved component dicts
-            project_files: list of project source artifacts
-            doc_mapping: sha1 -> omnibor_doc_id
-            logfile_hashes: file_path -> build-time sha1
-            direct_only: if True, include only direct
-                dependencies (exclude transitive).
-                Use for two-tier SBOMs where transitive
-                deps belong to a downstream SBOM.
-            static_only: if True, omit dynamically linked
-                library packages. Only include the root
-                binary, vendored/static libs, and the
-                build tool.
-
-        Returns:
-            dict: complete SPDX 2.3 JSON document
+        Returns (doc, sources) where sources is a list of
+        (artifact, owner SPDX ID) pairs for _iter_files().
         """
         doc_uuid = str(uuid.uuid4())
         now = datetime.now(timezone.utc).strftime(
@@ -862,33 +1166,40 @@ def emit(
             )
 
         # Add OmniBOR ref for root binary
-        for bin_path, sha1 in (
-            logfile_hashes.items()
-        ):
-            basename = Path(bin_path).name
-            if basename == self.binary_name:
-                omnibor_id = doc_mapping.get(sha1)
-                if omnibor_id:
-                    root_pkg["externalRefs"].append({
-                        "referenceCategory":
-                            "PERSISTENT-ID",
-                        "referenceType": "gitoid",
-                        "referenceLocator":
-                            f"gitoid:blob:sha1:"
-                            f"{omnibor_id}",
-                    })
-                root_pkg["checksums"].append({
-                    "algorithm": "SHA1",
-                    "checksumValue": sha1,
+        if logfile_basenames is not None:
+            bin_path = logfile_basenames.get(
+                self.binary_name
+            )
+        else:
+            bin_path = next(
+                (
+                    fp for fp in logfile_hashes
+                    if fp.rpartition("/")[2]
+                    == self.binary_name
+                ),
+                None,
+            )
+        if bin_path is not None:
+            sha1 = logfile_hashes[bin_path]
+            omnibor_id = doc_mapping.get(sha1)
+            if omnibor_id:
+                root_pkg["externalRefs"].append({
+                    "referenceCategory": "PERSISTENT-ID",
+                    "referenceType": "gitoid",
+                    "referenceLocator":
+                        self._GITOID_FMT(omnibor_id),
                 })
-                break
+            root_pkg["checksums"].append({
+                "algorithm": "SHA1",
+                "checksumValue": sha1,
+            })
 
         doc["packages"].append(root_pkg)
 
         # DESCRIBES relationship
         doc["relationships"].append({
             "spdxElementId": "SPDXRef-DOCUMENT",
-            "relationshipType": "DESCRIBES",
+            "relationshipType": _REL_DESCRIBES,
             "relatedSpdxElement": root_id,
         })
 
@@ -900,94 +1211,25 @@ def emit(
                     if c.get("direct")
                 ]
 
-            for comp in components:
-                safe_name = self._sanitize_spdx_id(
-                    comp["name"]
+            pkg_ids = [
+                self._next_spdx_id(
+                    self._sanitize_spdx_id(comp["name"])
                 )
-                pkg_id = self._next_spdx_id(safe_name)
-
-                linkage = (
-                    "direct" if comp.get("direct")
-                    else "transitive"
-                )
-                sonames = comp.get("sonames", [])
-                dpkg_pkgs = comp.get(
-                    "dpkg_packages", []
-                )
-
-                dl = (
-                    comp["homepage"]
-                    if comp.get("homepage")
-                    and comp["homepage"]
-                    != "NOASSERTION"
-                    else "NOASSERTION"
-                )
-                pkg = {
-                    "SPDXID": pkg_id,
-                    "name": comp["name"],
-                    "downloadLocation": dl,
-                    "filesAnalyzed": False,
-                    "primaryPackagePurpose":
-                        "LIBRARY",
-                    "externalRefs": [],
-                    "comment": (
-                        f"Dynamically linked "
-                        f"({linkage}). "
-                        f"sonames: "
-                        f"{', '.join(sonames)}. "
-                        f"dpkg: "
-                        f"{', '.join(dpkg_pkgs)}"
-                        f" ({comp.get('architecture', 'amd64')})"
-                    ),
-                }
-
-                # PURL
-                if comp.get("purl"):
-                    pkg["externalRefs"].append({
-                        "referenceCategory":
-                            "PACKAGE-MANAGER",
-                        "referenceType": "purl",
-                        "referenceLocator":
-                            comp["purl"],
-                    })
-
-                # CPE
-                if comp.get("cpe23"):
-                    pkg["externalRefs"].append({
-                        "referenceCategory":
-                            "SECURITY",
-                        "referenceType":
-                            "cpe23Type",
-                        "referenceLocator":
-                            comp["cpe23"],
-                    })
-
-                # Add optional fields only when known
-                if comp.get("version"):
-                    pkg["versionInfo"] = (
-                        comp["version"]
-                    )
-                supplier = comp.get("supplier", "")
-                if (
-                    supplier
-                    and supplier != "NOASSERTION"
-                ):
-                    pkg["supplier"] = (
-                        f"Organization: {supplier}"
-                    )
-                hp = comp.get("homepage", "")
-                if hp and hp != "NOASSERTION":
-                    pkg["homepage"] = hp
-
-                doc["packages"].append(pkg)
-
-                # DYNAMIC_LINK from root
-                doc["relationships"].append({
+                for comp in components
+            ]
+            doc["packages"].extend([
+                self._dynamic_package(comp, pkg_id)
+                for comp, pkg_id in zip(components, pkg_ids)
+            ])
+            # DYNAMIC_LINK from root
+            doc["relationships"].extend([
+                {
                     "spdxElementId": root_id,
-                    "relationshipType":
-                        "DYNAMIC_LINK",
+                    "relationshipType": _REL_DYNAMIC_LINK,
                     "relatedSpdxElement": pkg_id,
-                })
+                }
+                for pkg_id in pkg_ids
+            ])
 
         # --- GCC as build tool ---
         gcc_id = self._next_spdx_id("gcc")
@@ -1023,7 +1265,7 @@ def emit(
         doc["packages"].append(gcc_pkg)
         doc["relationships"].append({
             "spdxElementId": gcc_id,
-            "relationshipType": "BUILD_TOOL_OF",
+            "relationshipType": _REL_BUILD_TOOL_OF,
             "relatedSpdxElement": root_id,
         })
 
@@ -1049,9 +1291,8 @@ def emit(
             ]
             src_count = len([
                 fp for fp in file_paths
-                if Path(fp).suffix.lower()
-                in (".c", ".h", ".s", ".inc",
-                    ".cc", ".cpp", ".cxx", ".hpp")
+                if self._name_and_suffix(fp)[1]
+                in _SOURCE_EXTS
             ])
             pkg = {
                 "SPDXID": pkg_id,
@@ -1087,73 +1328,180 @@ def emit(
             doc["relationships"].append({
                 "spdxElementId": root_id,
                 "relationshipType":
-                    "STATIC_LINK",
+                    _REL_STATIC_LINK,
                 "relatedSpdxElement": pkg_id,
             })
 
         # --- Project source files ---
-        all_source = (
-            [(art, None) for art in own_files]
-            + [
-                (art, lib)
-                for lib, arts in vendored.items()
-                for art in arts
-            ]
+        # Vendored files belong to their library
+        # package; others to root
+        sources = [(art, root_id) for art in own_files]
+        sources.extend(
+            (art, vendored_pkg_ids[lib])
+            for lib, arts in vendored.items()
+            for art in arts
         )
-        for art, vendored_lib in all_source:
+        return doc, sources
+
+    def _iter_files(self, sources):
+        """Yield (file entry, owner ID) for source files."""
+        for art, owner_id in sources:
             fp = art["file_path"]
+            name, ext = self._name_and_suffix(fp)
             # Only include .c, .h, .S files
-            ext = Path(fp).suffix.lower()
-            if ext not in (
-                ".c", ".h", ".s", ".inc",
-                ".cc", ".cpp", ".cxx", ".hpp",
-            ):
+            if ext not in _SOURCE_EXTS:
                 continue
 
-            safe = self._sanitize_spdx_id(
-                Path(fp).name
-            )
+            safe = self._sanitize_spdx_id(name)
             file_id = self._next_spdx_id(
                 f"File-{safe}"
             )
             # Make path relative to repo
-            rel_path = fp
-            try:
-                rel_path = str(
-                    Path(fp).relative_to(
-                        Path(fp).parents[
-                            len(Path(fp).parts) - 3
-                        ]
-                    )
-                )
-            except (ValueError, IndexError):
-                pass
+            rel_path = self._rel_path(fp)
 
-            file_entry = {
+            yield {
                 "SPDXID": file_id,
                 "fileName": rel_path,
                 "checksums": [{
                     "algorithm": "SHA1",
                     "checksumValue": art["sha1"],
                 }],
-            }
-            doc["files"].append(file_entry)
-
-            # Vendored files belong to their
-            # library package; others to root
-            owner_id = (
-                vendored_pkg_ids[vendored_lib]
-                if vendored_lib
-                else root_id
-            )
+            }, owner_id
+
+    def emit(
+        self, components, project_files,
+        doc_mapping, logfile_hashes,
+        direct_only=False,
+        static_only=False,
+        logfile_basenames=None,
+    ):
+        """Generate SPDX 2.3 JSON dict.
+
+        Args:
+            components: list of resolved component dicts
+            project_files: list of project source artifacts
+            doc_mapping: sha1 -> omnibor_doc_id
+            logfile_hashes: file_path -> build-time sha1
+            direct_only: if True, include only direct
+                dependencies (exclude transitive).
+                Use for two-tier SBOMs where transitive
+                deps belong to a downstream SBOM.
+            static_only: if True, omit dynamically linked
+                library packages. Only include the root
+                binary, vendored/static libs, and the
+                build tool.
+            logfile_basenames: optional basename ->
+                file_path map from
+                AdgParser.load_raw_logfile_hashes();
+                avoids scanning logfile_hashes for the
+                root binary.
+
+        Returns:
+            dict: complete SPDX 2.3 JSON document
+        """
+        doc, sources = self._emit_packages(
+            components, project_files,
+            doc_mapping, logfile_hashes,
+            direct_only=direct_only,
+            static_only=static_only,
+            logfile_basenames=logfile_basenames,
+        )
+        for entry, owner_id in self._iter_files(sources):
+            doc["files"].append(entry)
             doc["relationships"].append({
                 "spdxElementId": owner_id,
-                "relationshipType": "CONTAINS",
-                "relatedSpdxElement": file_id,
+                "relationshipType": _REL_CONTAINS,
+                "relatedSpdxElement": entry["SPDXID"],
             })
-
         return doc
 
+    def stream_emit(
+        self, out_fp, components, project_files,
+        doc_mapping, logfile_hashes,
+        direct_only=False,
+        static_only=False,
+        logfile_basenames=None,
+    ):
+        """Write the SPDX document to out_fp incrementally.
+
+        Same content as emit(), but source files are
+        serialized one at a time instead of being held in
+        memory; only the (owner, file) ID pairs for the
+        CONTAINS relationships are kept until the end.
+        The JSON is written without indentation.
+
+        Args:
+            out_fp: text file object to write to
+            others: as for emit()
+        """
+        doc, sources = self._emit_packages(
+            components, project_files,
+            doc_mapping, logfile_hashes,
+            direct_only=direct_only,
+            static_only=static_only,
+            logfile_basenames=logfile_basenames,
+        )
+        dumps = json.dumps
+        write = out_fp.write
+        head = {
+            k: v for k, v in doc.items()
+            if k not in ("files", "relationships")
+        }
+        write(dumps(head)[:-1])
+        write(', "files": [')
+        contains = []
+        for i, (entry, owner_id) in enumerate(
+            self._iter_files(sources)
+        ):
+            if i:
+                write(", ")
+            write(dumps(entry))
+            contains.append((owner_id, entry["SPDXID"]))
+        write('], "relationships": [')
+        write(", ".join(
+            dumps(rel) for rel in doc["relationships"]
+        ))
+        for i, (owner_id, file_id) in enumerate(contains):
+            if i or doc["relationships"]:
+                write(", ")
+            write(dumps({
+                "spdxElementId": owner_id,
+                "relationshipType": _REL_CONTAINS,
+                "relatedSpdxElement": file_id,
+            }))
+        write("]}\n")
+
+    @staticmethod
+    def serialize(doc, compact=False):
+        """Serialize an SPDX document to UTF-8 JSON bytes.
+
+        With compact=True, the files and relationships
+        arrays are written in JSONH layout (see
+        compact_doc).
+        """
+        if compact:
+            doc = compact_doc(doc)
+        return (
+            json.dumps(doc, indent=2) + "\n"
+        ).encode("utf-8")
+
+    @staticmethod
+    def dump(doc, fp, compact=False):
+        """Write an SPDX document as JSON to a text file.
+
+        Same output as serialize(), but encoded chunk by
+        chunk so the full JSON text is never held in
+        memory.
+        """
+        if compact:
+            doc = compact_doc(doc)
+        json.dump(doc, fp, indent=2)
+        fp.write("\n")
+
+    def emit_bytes(self, *args, **kwargs):
+        """Like emit(), but return serialized JSON bytes."""
+        return self.serialize(self.emit(*args, **kwargs))
+
 
 # ============================================================
 # Facade
@@ -1171,12 +1519,59 @@ def __init__(
         self, bom_dir, repos_dir, repo_name,
         bomtrace_version="unknown",
         bomsh_version="unknown",
+        parallel=False,
     ):
         self.bom_dir = Path(bom_dir)
         self.repos_dir = Path(repos_dir)
         self.repo_name = repo_name
         self.bomtrace_version = bomtrace_version
         self.bomsh_version = bomsh_version
+        self.parallel = parallel
+        # (bom_dir, repos_dir) -> parsed ADG data, and
+        # (metadata, dynamic_libs path) -> (resolver,
+        # components); reused across generate() calls
+        # for several binaries of one build
+        self._parse_cache = {}
+        self._resolver_cache = {}
+
+    @staticmethod
+    def _gzip_level():
+        """Return the gzip level from OMNIBOR_GZIP_LEVEL.
+
+        Defaults to 6 when unset or not an integer in
+        the 0-9 range.
+        """
+        try:
+            level = int(
+                os.environ.get("OMNIBOR_GZIP_LEVEL", 6)
+            )
+        except ValueError:
+            return 6
+        return level if 0 <= level <= 9 else 6
+
+    def _parse_adg(self):
+        """Parse the ADG once per (bom_dir, repos_dir).
+
+        Returns (classified, doc_mapping, logfile_hashes,
+        logfile_basenames).
+        """
+        key = (str(self.bom_dir), str(self.repos_dir))
+        hit = self._parse_cache.get(key)
+        if hit is None:
+            parser = AdgParser(
+                self.bom_dir, self.repos_dir,
+                parallel=self.parallel,
+            )
+            logfile_basenames = {}
+            hit = self._parse_cache[key] = (
+                parser.parse(),
+                parser.load_doc_mapping(),
+                parser.load_raw_logfile_hashes(
+                    basenames=logfile_basenames
+                ),
+                logfile_basenames,
+            )
+        return hit
 
     def generate(
         self, output_path,
@@ -1184,11 +1579,14 @@ def generate(
         dynlib_dir=None,
         direct_only=False,
         static_only=False,
+        compact=False,
     ):
         """Generate SPDX for a single binary.
 
         Args:
-            output_path: where to write the SPDX JSON
+            output_path: where to write the SPDX JSON;
+                gzip-compressed if it ends in .gz
+                (level from OMNIBOR_GZIP_LEVEL, default 6)
             binary_name: name of the binary
                 (e.g. "curl" or "libcurl.so");
                 defaults to repo_name
@@ -1199,7 +1597,11 @@ def generate(
                 dependencies. Use when transitive deps
                 belong to a downstream binary's SBOM.
             static_only: if True, omit dynamically
-                linked library packages.
+                linked library packages; the
+                dynamic_libs.json is then not needed.
+            compact: if True, write files and
+                relationships in JSONH layout
+                (not valid SPDX until revived).
 
         Returns the output path on success, None on
         failure.
@@ -1207,14 +1609,10 @@ def generate(
         bin_name = binary_name or self.repo_name
 
         # Parse ADG for OmniBOR data
-        parser = AdgParser(
-            self.bom_dir, self.repos_dir
-        )
-        classified = parser.parse()
-        doc_mapping = parser.load_doc_mapping()
-        logfile_hashes = (
-            parser.load_raw_logfile_hashes()
-        )
+        (
+            classified, doc_mapping,
+            logfile_hashes, logfile_basenames,
+        ) = self._parse_adg()
 
         print(
             f"[{bin_name}] Source files: "
@@ -1236,40 +1634,56 @@ def generate(
             )
             return None
 
-        resolver = ComponentResolver(str(meta_path))
-
-        # Load dynamic library data
-        dl_dir = Path(
-            dynlib_dir
-            if dynlib_dir
-            else self.bom_dir / "metadata"
-        )
-        dynlib_path = dl_dir / "dynamic_libs.json"
-        if not dynlib_path.exists():
-            print(
-                f"[ERROR] {dynlib_path} not found. "
-                f"Run collect_dynamic_libs.py for "
-                f"{bin_name} first."
+        # Load dynamic library data; static-only SBOMs
+        # never list it, so skip reading and resolving
+        if static_only:
+            dynlib_path = None
+        else:
+            dl_dir = Path(
+                dynlib_dir
+                if dynlib_dir
+                else self.bom_dir / "metadata"
             )
-            return None
+            dynlib_path = dl_dir / "dynamic_libs.json"
+            if not dynlib_path.exists():
+                print(
+                    f"[ERROR] {dynlib_path} not found. "
+                    f"Run collect_dynamic_libs.py for "
+                    f"{bin_name} first."
+                )
+                return None
 
-        resolver.load_dynamic_libs(
-            str(dynlib_path)
-        )
-        components = (
-            resolver.resolve_dynamic_components()
+        key = (
+            str(meta_path),
+            dynlib_path and str(dynlib_path),
         )
+        cached = self._resolver_cache.get(key)
+        if cached is None:
+            resolver = ComponentResolver(str(meta_path))
+            components = []
+            if dynlib_path is not None:
+                resolver.load_dynamic_libs(
+                    str(dynlib_path)
+                )
+                components = (
+                    resolver.resolve_dynamic_components()
+                )
+            cached = self._resolver_cache[key] = (
+                resolver, components,
+            )
+        resolver, components = cached
 
-        direct = sum(
-            1 for c in components if c["direct"]
-        )
-        trans = len(components) - direct
-        print(
-            f"[{bin_name}] Dynamic libraries: "
-            f"{len(components)} components "
-            f"({direct} direct, "
-            f"{trans} transitive)"
-        )
+        if dynlib_path is not None:
+            direct = sum(
+                1 for c in components if c["direct"]
+            )
+            trans = len(components) - direct
+            print(
+                f"[{bin_name}] Dynamic libraries: "
+                f"{len(components)} components "
+                f"({direct} direct, "
+                f"{trans} transitive)"
+            )
 
         # Emit SPDX
         emitter = SpdxEmitter(
@@ -1291,14 +1705,23 @@ def generate(
             logfile_hashes=logfile_hashes,
             direct_only=direct_only,
             static_only=static_only,
+            logfile_basenames=logfile_basenames,
         )
 
-        # Write output
+        # Write output (gzip-compressed for *.gz paths)
         out = Path(output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
-        out.write_text(
-            json.dumps(doc, indent=2) + "\n"
-        )
+        if out.suffix == ".gz":
+            fh = gzip.open(
+                out, "wt", encoding="utf-8",
+                compresslevel=self._gzip_level(),
+            )
+            html_base = out.with_suffix("")
+        else:
+            fh = out.open("w", encoding="utf-8")
+            html_base = out
+        with fh:
+            SpdxEmitter.dump(doc, fh, compact=compact)
 
         pkg_count = len(doc["packages"])
         file_count = len(doc["files"])
@@ -1314,7 +1737,7 @@ def generate(
         try:
             from spdx_visualize import generate_html
             html_path = str(
-                out.with_suffix(".html")
+                html_base.with_suffix(".html")
             )
             generate_html(doc, html_path)
         except Exception as e:
@@ -1349,7 +1772,10 @@ def main():
     )
     ap.add_argument(
         "--output", required=True,
-        help="Output SPDX JSON file path",
+        help=(
+            "Output SPDX JSON file path "
+            "(gzip-compressed if it ends in .gz)"
+        ),
     )
     ap.add_argument(
         "--bomtrace-version", default="unknown",
@@ -1392,6 +1818,26 @@ def main():
             "vendored/static libs, and build tool."
         ),
     )
+    ap.add_argument(
+        "--spdx-compact",
+        action="store_true",
+        default=False,
+        help=(
+            "Write files/relationships in compact "
+            "JSONH layout (smaller, but not valid "
+            "SPDX until revived)."
+        ),
+    )
+    ap.add_argument(
+        "--parallel",
+        action="store_true",
+        default=False,
+        help=(
+            "Classify large treedbs "
+            f"(>= {AdgParser.PARALLEL_THRESHOLD} "
+            "entries) across worker processes."
+        ),
+    )
     args = ap.parse_args()
 
     gen = AdgSpdxGenerator(
@@ -1400,6 +1846,7 @@ def main():
         repo_name=args.repo_name,
         bomtrace_version=args.bomtrace_version,
         bomsh_version=args.bomsh_version,
+        parallel=args.parallel,
     )
     result = gen.generate(
         args.output,
@@ -1407,6 +1854,7 @@ def main():
         dynlib_dir=args.dynlib_dir,
         direct_only=args.direct_only,
         static_only=args.static_only,
+        compact=args.spdx_compact,
     )
     if result:
         print(f"Success: {result}")
@@ -13,133 +13,152 @@
 """
 
 import argparse
+import gzip
 import json
 import html
+import operator
 from pathlib import Path
 
 
+def revive_compact(doc):
+    """Expand JSONH-packed arrays written by --spdx-compact.
+
+    A packed array is [N, key1..keyN, values...]; plain
+    SPDX arrays (lists of objects) are left untouched.
+    Modifies doc in place and returns it.
+    """
+    for key in ("files", "relationships"):
+        arr = doc.get(key)
+        if not arr or not isinstance(arr[0], int):
+            continue
+        n = arr[0]
+        if n == 0:
+            # No keys, so no values to count rows by
+            doc[key] = []
+            continue
+        keys = arr[1:n + 1]
+        vals = arr[n + 1:]
+        doc[key] = [
+            dict(zip(keys, vals[i:i + n]))
+            for i in range(0, len(vals), n)
+        ]
+    return doc
+
+
+_rel_fields = operator.itemgetter(
+    "relationshipType", "spdxElementId",
+    "relatedSpdxElement",
+)
+
+# Node group assigned by each package-to-package
+# relationship, and the precedence when several apply
+_LINK_GROUPS = {
+    "STATIC_LINK": "static",
+    "DYNAMIC_LINK": "dynamic",
+    "BUILD_TOOL_OF": "build",
+}
+_GROUP_RANK = {
+    "other": 0, "root": 1, "build": 2,
+    "dynamic": 3, "static": 4,
+}
+
+
 def extract_graph(doc):
     """Extract nodes and edges from SPDX document.
 
     Returns:
-        nodes: list of {id, name, version, purpose, group, fileCount}
-        edges: list of {source, target, type}
-        file_counts: dict of SPDXID -> count of CONTAINS relationships
+        nodes: list of {id, name, version, purpose, group,
+            comment, fileCount}
+        edges: list of {source, target, type}, where
+            source/target are indices into nodes (the
+            form d3.forceLink resolves without an id map)
     """
-    pkg_map = {}
+    # Build nodes directly; pkg_index maps SPDXID to
+    # its position in nodes
+    nodes = []
+    pkg_index = {}
     for p in doc.get("packages", []):
-        pkg_map[p["SPDXID"]] = {
-            "id": p["SPDXID"],
+        spdx_id = p["SPDXID"]
+        purpose = p.get("primaryPackagePurpose", "")
+        node = {
+            "id": spdx_id,
             "name": p.get("name", "unknown"),
             "version": p.get("versionInfo", ""),
-            "purpose": p.get(
-                "primaryPackagePurpose", ""
+            "purpose": purpose,
+            "group": (
+                "root" if purpose == "APPLICATION"
+                else "other"
             ),
             "comment": p.get("comment", ""),
+            "fileCount": 0,
         }
-
-    # Count CONTAINS relationships per package
-    file_counts = {}
-    for r in doc.get("relationships", []):
-        if r["relationshipType"] == "CONTAINS":
-            src = r["spdxElementId"]
-            file_counts[src] = (
-                file_counts.get(src, 0) + 1
-            )
-
-    # Classify packages into groups
-    rels = doc.get("relationships", [])
-    static_targets = set()
-    dynamic_targets = set()
-    build_sources = set()
-
-    for r in rels:
-        rt = r["relationshipType"]
-        if rt == "STATIC_LINK":
-            static_targets.add(
-                r["relatedSpdxElement"]
-            )
-        elif rt == "DYNAMIC_LINK":
-            dynamic_targets.add(
-                r["relatedSpdxElement"]
-            )
-        elif rt == "BUILD_TOOL_OF":
-            build_sources.add(r["spdxElementId"])
-
-    nodes = []
-    for spdx_id, info in pkg_map.items():
-        if spdx_id in static_targets:
-            group = "static"
-        elif spdx_id in dynamic_targets:
-            group = "dynamic"
-        elif spdx_id in build_sources:
-            group = "build"
-        elif info["purpose"] == "APPLICATION":
-            group = "root"
+        idx = pkg_index.setdefault(spdx_id, len(nodes))
+        if idx == len(nodes):
+            nodes.append(node)
         else:
-            group = "other"
-
-        nodes.append({
-            "id": spdx_id,
-            "name": info["name"],
-            "version": info["version"],
-            "purpose": info["purpose"],
-            "group": group,
-            "comment": info["comment"],
-            "fileCount": file_counts.get(
-                spdx_id, 0
-            ),
-        })
+            nodes[idx] = node
 
-    # Edges: only package-to-package (skip CONTAINS, DESCRIBES)
+    # One pass over relationships: count CONTAINS per
+    # package, regroup linked packages, and collect
+    # package-to-package edges (skip CONTAINS, DESCRIBES)
     edges = []
-    for r in rels:
-        rt = r["relationshipType"]
-        src = r["spdxElementId"]
-        tgt = r["relatedSpdxElement"]
-        if rt in (
-            "STATIC_LINK", "DYNAMIC_LINK",
-            "BUILD_TOOL_OF",
-        ):
-            if src in pkg_map and tgt in pkg_map:
-                edges.append({
-                    "source": src,
-                    "target": tgt,
-                    "type": rt,
-                })
+    edges_append = edges.append
+    index_of = pkg_index.get
+    for rt, src, tgt in map(
+        _rel_fields, doc.get("relationships", ())
+    ):
+        if rt == "CONTAINS":
+            idx = index_of(src)
+            if idx is not None:
+                nodes[idx]["fileCount"] += 1
+            continue
+        if rt == "BUILD_TOOL_OF":
+            grouped = src
+        elif rt in _LINK_GROUPS:
+            grouped = tgt
+        else:
+            continue
+        idx = index_of(grouped)
+        if idx is not None:
+            node = nodes[idx]
+            group = _LINK_GROUPS[rt]
+            if (
+                _GROUP_RANK[group]
+                > _GROUP_RANK[node["group"]]
+            ):
+                node["group"] = group
+        src_idx = index_of(src)
+        tgt_idx = index_of(tgt)
+        if src_idx is not None and tgt_idx is not None:
+            edges_append({
+                "source": src_idx,
+                "target": tgt_idx,
+                "type": rt,
+            })
 
     return nodes, edges
 
 
-def generate_html(doc, output_path):
-    """Generate standalone HTML visualization."""
-    nodes, edges = extract_graph(doc)
-
-    doc_name = doc.get("name", "SPDX Document")
-    created = doc.get(
-        "creationInfo", {}
-    ).get("created", "")
-
-    graph_data = json.dumps({
-        "nodes": nodes,
-        "links": edges,
-    })
-
-    html_content = f"""<!DOCTYPE html>
+# HTML page split around the document name, creation
+# time and embedded graph data. The static pieces are
+# written verbatim; only the escaped name/time vary.
+_HTML_PRELUDE = """<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>SPDX Dependency Graph — {html.escape(doc_name)}</title>
+<title>SPDX Dependency Graph — """
+
+_HTML_STYLE = """</title>
 <style>
-  * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-  body {{
+  * { margin: 0; padding: 0; box-sizing: border-box; }
+  body {
     font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
     background: #0f1117;
     color: #e0e0e0;
     overflow: hidden;
-  }}
-  #header {{
+  }
+  #header {
     position: fixed; top: 0; left: 0; right: 0;
     background: rgba(15, 17, 23, 0.95);
     backdrop-filter: blur(8px);
@@ -149,18 +168,18 @@ def generate_html(doc, output_path):
     display: flex;
     align-items: center;
     gap: 24px;
-  }}
-  #header h1 {{
+  }
+  #header h1 {
     font-size: 16px;
     font-weight: 600;
     color: #fff;
     white-space: nowrap;
-  }}
-  #header .meta {{
+  }
+  #header .meta {
     font-size: 12px;
     color: #888;
-  }}
-  #legend {{
+  }
+  #legend {
     position: fixed; top: 60px; right: 20px;
     background: rgba(22, 24, 32, 0.95);
     backdrop-filter: blur(8px);
@@ -170,29 +189,29 @@ def generate_html(doc, output_path):
     z-index: 100;
     font-size: 13px;
     min-width: 200px;
-  }}
-  #legend h3 {{
+  }
+  #legend h3 {
     font-size: 13px;
     font-weight: 600;
     margin-bottom: 10px;
     color: #fff;
-  }}
-  .legend-item {{
+  }
+  .legend-item {
     display: flex;
     align-items: center;
     gap: 8px;
     margin-bottom: 6px;
-  }}
-  .legend-dot {{
+  }
+  .legend-dot {
     width: 12px; height: 12px;
     border-radius: 50%;
     flex-shrink: 0;
-  }}
-  .legend-line {{
+  }
+  .legend-line {
     width: 24px; height: 2px;
     flex-shrink: 0;
-  }}
-  #tooltip {{
+  }
+  #tooltip {
     position: fixed;
     background: rgba(22, 24, 32, 0.97);
     border: 1px solid #3a3d45;
@@ -205,34 +224,36 @@ def generate_html(doc, output_path):
     z-index: 200;
     max-width: 350px;
     box-shadow: 0 4px 20px rgba(0,0,0,0.4);
-  }}
-  #tooltip .tt-name {{
+  }
+  #tooltip .tt-name {
     font-weight: 600;
     font-size: 14px;
     color: #fff;
     margin-bottom: 4px;
-  }}
-  #tooltip .tt-row {{
+  }
+  #tooltip .tt-row {
     color: #aaa;
     margin-top: 2px;
-  }}
-  #tooltip .tt-row span {{
+  }
+  #tooltip .tt-row span {
     color: #ddd;
-  }}
-  #graph {{ width: 100vw; height: 100vh; }}
-  svg {{ display: block; }}
+  }
+  #graph { width: 100vw; height: 100vh; }
+  svg { display: block; }
 
   /* Edge styles */
-  .link-STATIC_LINK {{ stroke: #4ecdc4; }}
-  .link-DYNAMIC_LINK {{ stroke: #ff6b6b; }}
-  .link-BUILD_TOOL_OF {{ stroke: #ffd93d; }}
+  .link-STATIC_LINK { stroke: #4ecdc4; }
+  .link-DYNAMIC_LINK { stroke: #ff6b6b; }
+  .link-BUILD_TOOL_OF { stroke: #ffd93d; }
 </style>
 </head>
 <body>
 
 <div id="header">
   <h1>SPDX Dependency Graph</h1>
-  <span class="meta">{html.escape(doc_name)} &mdash; {html.escape(created)}</span>
+  <span class="meta">"""
+
+_HTML_BODY = """</span>
 </div>
 
 <div id="legend">
@@ -278,21 +299,23 @@ def generate_html(doc, output_path):
 
 <script src="https://d3js.org/d3.v7.min.js"></script>
 <script>
-const data = {graph_data};
+const data = """
+
+_HTML_TAIL = """;
 
-const colors = {{
+const colors = {
   root: '#7c5cfc',
   static: '#4ecdc4',
   dynamic: '#ff6b6b',
   build: '#ffd93d',
   other: '#888',
-}};
+};
 
-const linkColors = {{
+const linkColors = {
   'STATIC_LINK': '#4ecdc4',
   'DYNAMIC_LINK': '#ff6b6b',
   'BUILD_TOOL_OF': '#ffd93d',
-}};
+};
 
 const width = window.innerWidth;
 const height = window.innerHeight;
@@ -310,7 +333,7 @@ def generate_html(doc, output_path):
 
 // Arrow markers
 const defs = svg.append('defs');
-Object.entries(linkColors).forEach(([type, color]) => {{
+Object.entries(linkColors).forEach(([type, color]) => {
   defs.append('marker')
     .attr('id', 'arrow-' + type)
     .attr('viewBox', '0 -5 10 10')
@@ -322,12 +345,11 @@ def generate_html(doc, output_path):
     .append('path')
     .attr('d', 'M0,-4L10,0L0,4')
     .attr('fill', color);
-}});
+});
 
 // Simulation
 const simulation = d3.forceSimulation(data.nodes)
   .force('link', d3.forceLink(data.links)
-    .id(d => d.id)
     .distance(d => d.type === 'BUILD_TOOL_OF' ? 180 : 140))
   .force('charge', d3.forceManyBody().strength(-600))
   .force('center', d3.forceCenter(width / 2, height / 2))
@@ -367,12 +389,12 @@ def generate_html(doc, output_path):
 
 // Node circles — size by file count
 node.append('circle')
-  .attr('r', d => {{
+  .attr('r', d => {
     if (d.group === 'root') return 24;
     if (d.fileCount > 50) return 18;
     if (d.fileCount > 10) return 14;
     return 12;
-  }})
+  })
   .attr('fill', d => colors[d.group] || colors.other)
   .attr('stroke', '#fff')
   .attr('stroke-width', d => d.group === 'root' ? 2.5 : 1.5)
@@ -389,11 +411,11 @@ def generate_html(doc, output_path):
 
 // Labels
 node.append('text')
-  .attr('dy', d => {{
+  .attr('dy', d => {
     if (d.group === 'root') return 38;
     if (d.fileCount > 50) return 30;
     return 26;
-  }})
+  })
   .attr('text-anchor', 'middle')
   .attr('font-size', d => d.group === 'root' ? 13 : 11)
   .attr('font-weight', d => d.group === 'root' ? 700 : 500)
@@ -403,11 +425,11 @@ def generate_html(doc, output_path):
 // Version labels
 node.filter(d => d.version)
   .append('text')
-  .attr('dy', d => {{
+  .attr('dy', d => {
     if (d.group === 'root') return 52;
     if (d.fileCount > 50) return 43;
     return 39;
-  }})
+  })
   .attr('text-anchor', 'middle')
   .attr('font-size', 10)
   .attr('fill', '#888')
@@ -426,7 +448,7 @@ def generate_html(doc, output_path):
 // Tooltip
 const tooltip = d3.select('#tooltip');
 
-node.on('mouseover', (event, d) => {{
+node.on('mouseover', (event, d) => {
   const rows = [];
   if (d.version) rows.push('<div class="tt-row">Version: <span>' + d.version + '</span></div>');
   rows.push('<div class="tt-row">Purpose: <span>' + d.purpose + '</span></div>');
@@ -439,17 +461,17 @@ def generate_html(doc, output_path):
   tooltip.style('opacity', 1)
     .style('left', (event.clientX + 16) + 'px')
     .style('top', (event.clientY - 10) + 'px');
-}})
-.on('mousemove', (event) => {{
+})
+.on('mousemove', (event) => {
   tooltip.style('left', (event.clientX + 16) + 'px')
     .style('top', (event.clientY - 10) + 'px');
-}})
-.on('mouseout', () => {{
+})
+.on('mouseout', () => {
   tooltip.style('opacity', 0);
-}});
+});
 
 // Tick
-simulation.on('tick', () => {{
+simulation.on('tick', () => {
   link
     .attr('x1', d => d.source.x)
     .attr('y1', d => d.source.y)
@@ -461,26 +483,46 @@ def generate_html(doc, output_path):
     .attr('y', d => (d.source.y + d.target.y) / 2 - 6);
 
   node.attr('transform', d => 'translate(' + d.x + ',' + d.y + ')');
-}});
+});
 
-function dragstarted(event, d) {{
+function dragstarted(event, d) {
   if (!event.active) simulation.alphaTarget(0.3).restart();
   d.fx = d.x; d.fy = d.y;
-}}
-function dragged(event, d) {{
+}
+function dragged(event, d) {
   d.fx = event.x; d.fy = event.y;
-}}
-function dragended(event, d) {{
+}
+function dragended(event, d) {
   if (!event.active) simulation.alphaTarget(0);
   d.fx = null; d.fy = null;
-}}
+}
 </script>
 </body>
 </html>"""
 
+
+def generate_html(doc, output_path):
+    """Generate standalone HTML visualization."""
+    nodes, edges = extract_graph(doc)
+
+    doc_name = html.escape(doc.get("name", "SPDX Document"))
+    created = html.escape(doc.get(
+        "creationInfo", {}
+    ).get("created", ""))
+
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(html_content)
+    # Write the template around the graph data piecewise
+    # so the (possibly large) graph JSON is streamed to the
+    # file instead of being built into one big string
+    with out.open("w", encoding="utf-8") as fh:
+        fh.write(_HTML_PRELUDE)
+        fh.write(doc_name)
+        fh.write(_HTML_STYLE)
+        fh.write(f"{doc_name} &mdash; {created}")
+        fh.write(_HTML_BODY)
+        json.dump({"nodes": nodes, "links": edges}, fh)
+        fh.write(_HTML_TAIL)
     print(f"[OK] Visualization: {out}")
     print(
         f"     {len(nodes)} packages, "
@@ -498,7 +540,7 @@ def main():
     )
     ap.add_argument(
         "input",
-        help="Path to SPDX 2.3 JSON file",
+        help="Path to SPDX 2.3 JSON file (.json or .json.gz)",
     )
     ap.add_argument(
         "-o", "--output",
@@ -510,11 +552,15 @@ def main():
     )
     args = ap.parse_args()
 
-    doc = json.loads(Path(args.input).read_text())
+    raw = Path(args.input).read_bytes()
+    if args.input.endswith(".gz"):
+        raw = gzip.decompress(raw)
+    doc = json.loads(raw)
+    revive_compact(doc)
 
     output = args.output
     if not output:
-        inp = Path(args.input)
+        inp = Path(args.input.removesuffix(".gz"))
         output = str(
             inp.parent / (inp.stem + ".html")
         )
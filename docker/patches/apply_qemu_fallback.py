@@ -13,17 +13,27 @@
 3. Adds a call in strace.c at TE_STOP_BEFORE_EXECVE to record the
    command via /proc when decode_execve failed to do so
 4. Exports bomsh_record_command_proc in bomsh_hook.h
+5. Widens the bomsh_cmds hash table (BOMSH_CMDS_SIZE) if it is smaller
 """
+import re
 import sys
 
+# bomsh_cmds bucket count after patching (prime)
+BOMSH_CMDS_SIZE = 4099
+CMDS_SIZE_RE = re.compile(
+    rb"^#define\s+BOMSH_CMDS_SIZE\s+(\d+)", re.M
+)
+
 
 def patch_bomsh_hook_c(path):
     """Patch bomsh_hook.c with /proc fallback functions."""
-    with open(path) as f:
+    # Patch as bytes: the anchors are ASCII, so there is no
+    # need to decode (and re-encode) the whole source file
+    with open(path, "rb") as f:
         code = f.read()
 
     # --- 1. Insert /proc fallback helpers before bomsh_get_rootdir ---
-    anchor = "static char * bomsh_get_rootdir(struct tcb *tcp)"
+    anchor = b"static char * bomsh_get_rootdir(struct tcb *tcp)"
     if anchor not in code:
         print("ERROR: could not find bomsh_get_rootdir anchor")
         sys.exit(1)
@@ -32,14 +42,18 @@ def patch_bomsh_hook_c(path):
 /*
  * QEMU FALLBACK: /proc-based helpers for reading process info.
  * Used when strace cannot decode syscall registers (no mpers).
+ * Entries are read relative to an O_PATH fd on /proc/<pid>, so the
+ * /proc path is resolved once per exec instead of once per entry.
  */
+#include <fcntl.h>
+
 static char **
-bomsh_proc_read_cmdline(pid_t pid, int *out_argc)
+bomsh_proc_read_cmdline(int dirfd, int *out_argc)
 {
-	char cmdpath[32];
-	sprintf(cmdpath, "/proc/%d/cmdline", pid);
-	FILE *f = fopen(cmdpath, "r");
-	if (!f) { if (out_argc) *out_argc = 0; return NULL; }
+	int cmdfd = openat(dirfd, "cmdline", O_RDONLY);
+	if (cmdfd < 0) { if (out_argc) *out_argc = 0; return NULL; }
+	FILE *f = fdopen(cmdfd, "r");
+	if (!f) { close(cmdfd); if (out_argc) *out_argc = 0; return NULL; }
 	char buf[131072];
 	size_t len = fread(buf, 1, sizeof(buf) - 1, f);
 	fclose(f);
@@ -47,11 +61,16 @@ def patch_bomsh_hook_c(path):
 	buf[len] = 0;
 	int argc = 0;
 	for (size_t i = 0; i < len; i++) { if (buf[i] == 0) argc++; }
+	if (argc == 0) { if (out_argc) *out_argc = 0; return NULL; }
+	/* One pool holds every string; argv[i] point into it, and
+	 * argv[0] is the pool itself (see bomsh_proc_free_argv) */
+	char *pool = (char *)malloc(len + 1);
+	memcpy(pool, buf, len + 1);
 	char **argv = (char **)malloc((argc + 1) * sizeof(char *));
 	int idx = 0; size_t start = 0;
 	for (size_t i = 0; i <= len && idx < argc; i++) {
-		if (i == len || buf[i] == 0) {
-			argv[idx++] = strdup(buf + start);
+		if (i == len || pool[i] == 0) {
+			argv[idx++] = pool + start;
 			start = i + 1;
 		}
 	}
@@ -60,6 +79,57 @@ def patch_bomsh_hook_c(path):
 	return argv;
 }
 
+/* Free a pooled argv from bomsh_proc_read_cmdline */
+static void
+bomsh_proc_free_argv(char **argv)
+{
+	free(argv[0]);
+	free(argv);
+}
+
+/*
+ * Give each pooled argv string its own allocation, as bomsh_hook.c
+ * expects for cmd->argv. Only done once a command is recorded, so
+ * execs that are skipped cost two mallocs instead of argc + 1.
+ */
+static void
+bomsh_proc_own_argv(char **argv, int argc)
+{
+	char *pool = argv[0];
+	for (int i = 0; i < argc; i++) argv[i] = strdup(argv[i]);
+	free(pool);
+}
+
+/*
+ * Memo of bomsh_is_watched_program() answers, keyed by program path.
+ * The watch list is fixed once bomsh's config is loaded, and a build
+ * execs the same few programs (cc, ld, as, ar...) over and over, so a
+ * small direct-mapped cache answers most execs with a hash + strcmp
+ * instead of a scan of the watch list.
+ */
+#define BOMSH_PROC_WATCH_CACHE_SIZE 64
+static struct {
+	char *path;
+	int watched;
+} bomsh_proc_watch_cache[BOMSH_PROC_WATCH_CACHE_SIZE];
+
+static int
+bomsh_proc_is_watched(char *path)
+{
+	unsigned int h = 5381;
+	for (const char *p = path; *p; p++)
+		h = h * 33 + (unsigned char)*p;
+	h %= BOMSH_PROC_WATCH_CACHE_SIZE;
+	if (bomsh_proc_watch_cache[h].path
+	    && strcmp(bomsh_proc_watch_cache[h].path, path) == 0)
+		return bomsh_proc_watch_cache[h].watched;
+	int watched = bomsh_is_watched_program(path);
+	free(bomsh_proc_watch_cache[h].path);
+	bomsh_proc_watch_cache[h].path = strdup(path);
+	bomsh_proc_watch_cache[h].watched = watched;
+	return watched;
+}
+
 /*
  * QEMU FALLBACK: record a command using /proc instead of ptrace regs.
  * Called from strace.c at TE_STOP_BEFORE_EXECVE when the process is
@@ -70,18 +140,32 @@ def patch_bomsh_hook_c(path):
 {
 	if (g_bomsh_config.trace_execve_cmd_only == 1) return 0;
 
-	/* Skip if decode_execve already recorded this command */
+	/*
+	 * Skip if decode_execve already recorded this command. Under
+	 * QEMU decode_execve almost never records anything, so the
+	 * bucket is usually empty and the chain walk is skipped.
+	 * Deliberately no "last recorded pid" memo here: one pid can
+	 * execve several times (sh -c 'exec gcc ...'), and each exec
+	 * must be recorded once the previous record was consumed.
+	 */
 	int idx_check = pid % BOMSH_CMDS_SIZE;
 	bomsh_cmd_data_t *existing = bomsh_cmds[idx_check];
-	while (existing) {
-		if (existing->pid == pid) return 0;
-		existing = existing->next;
+	if (__builtin_expect(existing != NULL, 0)) {
+		for (; existing; existing = existing->next) {
+			if (existing->pid == pid) return 0;
+		}
 	}
 
+	/* Open /proc/<pid> once; all reads below are relative to it */
+	char link[32];
+	sprintf(link, "/proc/%d", pid);
+	int dirfd = open(link, O_PATH | O_DIRECTORY);
+	if (dirfd < 0) return 0;
+
 	/* Read argv from /proc/<pid>/cmdline first — we need it early */
 	int num_argv = 0;
-	char **argv = bomsh_proc_read_cmdline(pid, &num_argv);
-	if (!argv || num_argv < 1) return 0;
+	char **argv = bomsh_proc_read_cmdline(dirfd, &num_argv);
+	if (!argv || num_argv < 1) { close(dirfd); return 0; }
 
 	/*
 	 * Read program path from /proc/<pid>/exe.
@@ -94,13 +178,11 @@ def patch_bomsh_hook_c(path):
 	 * (bomsh_hook_program -> bomsh_process_shell_command) will handle
 	 * dispatch based on basename of cmd->path.
 	 */
-	char link[32];
 	static char exe_path[PATH_MAX];
-	sprintf(link, "/proc/%d/exe", pid);
-	int bytes = readlink(link, exe_path, PATH_MAX - 1);
+	int bytes = readlinkat(dirfd, "exe", exe_path, PATH_MAX - 1);
 	if (bytes <= 0) {
-		for (int i = 0; i < num_argv; i++) free(argv[i]);
-		free(argv);
+		close(dirfd);
+		bomsh_proc_free_argv(argv);
 		return 0;
 	}
 	exe_path[bytes] = 0;
@@ -114,8 +196,8 @@ def patch_bomsh_hook_c(path):
 				"\n===proc fallback: rosetta wrapper detected, "
 				"real path from argv[1]: %s\n", path);
 		} else {
-			for (int i = 0; i < num_argv; i++) free(argv[i]);
-			free(argv);
+			close(dirfd);
+			bomsh_proc_free_argv(argv);
 			return 0;
 		}
 	} else {
@@ -123,23 +205,22 @@ def patch_bomsh_hook_c(path):
 	}
 
 	/* Now check if this program is one we care about */
-	if (!bomsh_is_watched_program(path)) {
+	if (!bomsh_proc_is_watched(path)) {
 		bomsh_log_printf(8,
 			"\n===proc fallback: path %s not watched, skip\n", path);
+		close(dirfd);
 		free(path);
-		for (int i = 0; i < num_argv; i++) free(argv[i]);
-		free(argv);
+		bomsh_proc_free_argv(argv);
 		return 0;
 	}
 
 	/* Read cwd */
 	static char pwd_buf[PATH_MAX];
-	sprintf(link, "/proc/%d/cwd", pid);
-	bytes = readlink(link, pwd_buf, PATH_MAX - 1);
+	bytes = readlinkat(dirfd, "cwd", pwd_buf, PATH_MAX - 1);
 	if (bytes <= 0) {
+		close(dirfd);
 		free(path);
-		for (int i = 0; i < num_argv; i++) free(argv[i]);
-		free(argv);
+		bomsh_proc_free_argv(argv);
 		return 0;
 	}
 	pwd_buf[bytes] = 0;
@@ -147,12 +228,11 @@ def patch_bomsh_hook_c(path):
 
 	/* Read root */
 	static char root_buf[PATH_MAX];
-	sprintf(link, "/proc/%d/root", pid);
-	bytes = readlink(link, root_buf, PATH_MAX - 1);
+	bytes = readlinkat(dirfd, "root", root_buf, PATH_MAX - 1);
+	close(dirfd);
 	if (bytes <= 0) {
 		free(path); free(pwd);
-		for (int i = 0; i < num_argv; i++) free(argv[i]);
-		free(argv);
+		bomsh_proc_free_argv(argv);
 		return 0;
 	}
 	root_buf[bytes] = 0;
@@ -162,6 +242,8 @@ def patch_bomsh_hook_c(path):
 		"\n===proc fallback record pid %d path: %s args: %d\n",
 		pid, path, num_argv);
 
+	bomsh_proc_own_argv(argv, num_argv);
+
 	/* Store in global bomsh_cmds for later retrieval by hook_program */
 	bomsh_cmd_data_t *cmd = (bomsh_cmd_data_t *)calloc(
 		1, sizeof(bomsh_cmd_data_t));
@@ -182,62 +264,80 @@ def patch_bomsh_hook_c(path):
 }
 
 """
-    code = code.replace(anchor, helpers + anchor, 1)
+    code = code.replace(anchor, helpers.encode() + anchor, 1)
     print("  1. Inserted /proc helpers + bomsh_record_command_proc")
 
-    with open(path, "w") as f:
+    # --- 2. Widen the bomsh_cmds hash table ---
+    # Chains are keyed by pid % BOMSH_CMDS_SIZE; a prime near the
+    # number of concurrently traced pids keeps them short.
+    m = CMDS_SIZE_RE.search(code)
+    if m and int(m.group(1)) < BOMSH_CMDS_SIZE:
+        code = (
+            code[:m.start(1)]
+            + str(BOMSH_CMDS_SIZE).encode()
+            + code[m.end(1):]
+        )
+        print(
+            f"  2. BOMSH_CMDS_SIZE {int(m.group(1))} -> "
+            f"{BOMSH_CMDS_SIZE}"
+        )
+    else:
+        print("  2. BOMSH_CMDS_SIZE left unchanged")
+
+    with open(path, "wb") as f:
         f.write(code)
     print("  bomsh_hook.c patched OK")
 
 
 def patch_bomsh_hook_h(path):
     """Add bomsh_record_command_proc declaration to header."""
-    with open(path) as f:
+    with open(path, "rb") as f:
         code = f.read()
 
-    decl = "extern void bomsh_hook_program(int pid, int status);"
+    decl = b"extern void bomsh_hook_program(int pid, int status);"
     if decl not in code:
         print("ERROR: could not find bomsh_hook_program decl")
         sys.exit(1)
 
     new_decl = (
-        decl + "\n\n"
-        "// QEMU fallback: record command from /proc "
-        "(process must be alive)\n"
-        "extern int bomsh_record_command_proc(pid_t pid);\n"
+        decl + b"\n\n"
+        b"// QEMU fallback: record command from /proc "
+        b"(process must be alive)\n"
+        b"extern int bomsh_record_command_proc(pid_t pid);\n"
     )
     code = code.replace(decl, new_decl, 1)
 
-    with open(path, "w") as f:
+    with open(path, "wb") as f:
         f.write(code)
     print("  bomsh_hook.h patched OK")
 
 
 def patch_strace_c(path):
     """Add bomsh_record_command_proc call at TE_STOP_BEFORE_EXECVE."""
-    with open(path) as f:
+    with open(path, "rb") as f:
         code = f.read()
 
     # Find TE_STOP_BEFORE_EXECVE case
-    anchor = "case TE_STOP_BEFORE_EXECVE:"
-    if anchor not in code:
+    anchor = b"case TE_STOP_BEFORE_EXECVE:"
+    start = code.find(anchor)
+    if start < 0:
         print("ERROR: could not find TE_STOP_BEFORE_EXECVE")
         sys.exit(1)
 
     # Find the flag clear line right after the case
     flag_clear = (
-        "current_tcp->flags &= ~TCB_CHECK_EXEC_SYSCALL;"
+        b"current_tcp->flags &= ~TCB_CHECK_EXEC_SYSCALL;"
     )
-    idx = code.find(flag_clear)
+    idx = code.find(flag_clear, start)
     if idx < 0:
         print("ERROR: could not find TCB_CHECK_EXEC_SYSCALL clear")
         sys.exit(1)
 
     # Find the end of that line
-    eol = code.find("\n", idx)
+    eol = code.find(b"\n", idx)
 
     # Insert our /proc fallback call right after the flag clear
-    insertion = """
+    insertion = b"""
 \t\t/*
 \t\t * QEMU FALLBACK: If decode_execve() could not record the
 \t\t * command (broken syscall decoding under QEMU), try to
@@ -247,7 +347,7 @@ def patch_strace_c(path):
 """
     code = code[:eol + 1] + insertion + code[eol + 1:]
 
-    with open(path, "w") as f:
+    with open(path, "wb") as f:
         f.write(code)
     print("  strace.c patched OK")
 
@@ -6,12 +6,18 @@
 """
 
 import base64
+import contextlib
+import io
 import json
+import os
 import sys
 import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
 # Add app/ to path so we can import add_repo
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
@@ -19,11 +25,62 @@
 import add_repo
 import yaml
 from add_repo import (
-    GitHubClient, BuildSystemDetector,
+    GitHubClient, FileIndex, BuildSystemDetector,
     DependencyAnalyzer, BinaryDetector,
     BuildStepGenerator, ConfigGenerator,
     RepoDiscovery,
 )
+from data_loader import DataLoader
+
+
+# The config entry most main() tests have generate_entry
+# return; tests take a dict() copy and override keys
+_DEFAULT_ENTRY = MappingProxyType({
+    "url": "x", "branch": "master",
+    "build_steps": ["make"],
+    "clean_cmd": "make clean",
+    "description": "test",
+    "output_binaries": ["curl"],
+})
+
+
+# GET repos/curl/curl, trimmed to the fields _normalize reads
+_CURL_API = MappingProxyType({
+    "full_name": "curl/curl",
+    "description": "transfer lib",
+    "html_url": "https://github.com/curl/curl",
+    "stargazers_count": 40000,
+    "default_branch": "master",
+    "language": "C",
+})
+
+
+def _mock_proc(returncode=0, stdout="", stderr=""):
+    """Stand-in for the CompletedProcess subprocess.run returns."""
+    return SimpleNamespace(
+        returncode=returncode, stdout=stdout, stderr=stderr,
+    )
+
+
+# Repo info the main() tests' bundles carry; main() only
+# reads it, so tests share it and override the description
+_CURL_INFO = {
+    "fullName": "curl/curl",
+    "defaultBranch": "master",
+    "stargazersCount": 40000,
+    "language": "C",
+    "description": "test",
+}
+
+
+class _Needles:
+    """Fixed strings the main() / description tests look for."""
+
+    NEW_PKG = "libnew-dev"
+    ALL_OK = "All required packages"
+    NONE_INSTALLED = "Already installed: none"
+    NO_FLAGS = "No optional dependency flags"
+    ELLIPSIS = "..."
 
 
 # ============================================================
@@ -51,6 +108,12 @@ def test_ssh_url(self):
         )
         self.assertEqual(result, "curl/curl")
 
+    def test_url_with_subpath(self):
+        result = GitHubClient.parse_github_url(
+            "https://www.github.com/curl/curl/tree/master"
+        )
+        self.assertEqual(result, "curl/curl")
+
     def test_plain_name_returns_none(self):
         self.assertIsNone(
             GitHubClient.parse_github_url("curl")
@@ -67,158 +130,478 @@ def test_owner_repo_returns_none(self):
 class TestGitHubClientApi(unittest.TestCase):
     """Tests for GitHubClient.api()."""
 
-    @patch("add_repo.subprocess.run")
-    def test_success(self, mock_run):
-        mock_run.return_value = MagicMock(
+    @classmethod
+    def setUpClass(cls):
+        cls.client = GitHubClient()
+
+    def setUp(self):
+        patcher = patch("add_repo.subprocess.run")
+        self.mock_run = patcher.start()
+        self.addCleanup(patcher.stop)
+        # Exact gh commands below assume no OMNIBOR_GH_*
+        env = patch.dict(os.environ, clear=True)
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_success(self):
+        self.mock_run.return_value = _mock_proc(
             returncode=0,
             stdout='{"full_name": "curl/curl"}',
         )
-        client = GitHubClient()
-        result = client.api("repos/curl/curl")
+        result = self.client.api("repos/curl/curl")
         self.assertEqual(
             result["full_name"], "curl/curl"
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_failure_returns_none(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_failure_returns_none(self):
+        self.mock_run.return_value = _mock_proc(
             returncode=1, stdout="", stderr="error",
         )
-        client = GitHubClient()
         self.assertIsNone(
-            client.api("repos/bad/repo")
+            self.client.api("repos/bad/repo")
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_invalid_json(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_invalid_json(self):
+        self.mock_run.return_value = _mock_proc(
             returncode=0, stdout="not json",
         )
-        client = GitHubClient()
         self.assertIsNone(
-            client.api("repos/curl/curl")
+            self.client.api("repos/curl/curl")
         )
 
+    def test_cache_ttl_passed_to_gh(self):
+        self.mock_run.return_value = _mock_proc(
+            returncode=0, stdout=b"{}",
+        )
+        GitHubClient(cache_ttl="1h").api("repos/x/y")
+        cmd = self.mock_run.call_args.args[0]
+        self.assertEqual(cmd[-2:], ["--cache", "1h"])
+
+    def test_parses_bytes_output(self):
+        self.mock_run.return_value = _mock_proc(
+            returncode=0,
+            stdout=b'{"full_name": "curl/curl"}',
+        )
+        result = self.client.api("repos/curl/curl")
+        self.assertEqual(
+            result["full_name"], "curl/curl"
+        )
+        self.assertNotIn(
+            "text", self.mock_run.call_args.kwargs
+        )
 
-class TestGitHubClientSearchRepos(unittest.TestCase):
-    """Tests for GitHubClient.search_repos()."""
 
+class TestGitHubClientFromEnv(unittest.TestCase):
+    """Tests for GitHubClient.from_env()."""
+
+    def test_direct_from_env(self):
+        with patch.dict(
+            os.environ, {"OMNIBOR_GH_DIRECT": "1"}
+        ):
+            self.assertTrue(GitHubClient.from_env().direct)
+        with patch.dict(os.environ, clear=True):
+            self.assertFalse(GitHubClient.from_env().direct)
+
+    def test_cache_settings_from_env(self):
+        env = {
+            "OMNIBOR_GH_CACHE": "/tmp/gh.json",
+            "OMNIBOR_GH_CACHE_TTL": "1h",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            client = GitHubClient.from_env()
+        self.assertEqual(client.cache_file, "/tmp/gh.json")
+        self.assertEqual(client.cache_ttl, "1h")
+
+    def test_constructor_ignores_env(self):
+        env = {
+            "OMNIBOR_GH_DIRECT": "1",
+            "OMNIBOR_GH_CACHE": "/tmp/gh.json",
+            "OMNIBOR_GH_CACHE_TTL": "1h",
+        }
+        with patch.dict(os.environ, env):
+            client = GitHubClient(cache_ttl="")
+        self.assertFalse(client.direct)
+        self.assertIsNone(client.cache_file)
+        self.assertFalse(client.cache_ttl)
+
+
+class TestGitHubClientDirectApi(unittest.TestCase):
+    """Tests for GitHubClient.api() with direct=True."""
+
+    @staticmethod
+    def _response(body, link=""):
+        resp = MagicMock()
+        resp.status = 200
+        resp.getheader.return_value = link
+        resp.read.return_value = json.dumps(body).encode()
+        return resp
+
+    @patch("add_repo.http.client.HTTPSConnection")
     @patch("add_repo.subprocess.run")
-    def test_exact_name_match(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_follows_pagination(self, mock_run, mock_conn):
+        mock_run.return_value = _mock_proc(
+            returncode=0, stdout="tok\n",
+        )
+        conn = mock_conn.return_value
+        conn.getresponse.side_effect = [
+            self._response(
+                [{"name": "a"}],
+                '<https://api.github.com/repos/x/y'
+                '/contents?page=2>; rel="next"',
+            ),
+            self._response([{"name": "b"}]),
+        ]
+        client = GitHubClient(direct=True)
+        result = client.api("repos/x/y/contents")
+        self.assertEqual(
+            result, [{"name": "a"}, {"name": "b"}]
+        )
+        paths = [c.args[1] for c in conn.request.call_args_list]
+        self.assertEqual(paths, [
+            "/repos/x/y/contents",
+            "/repos/x/y/contents?page=2",
+        ])
+        headers = conn.request.call_args.kwargs["headers"]
+        self.assertEqual(
+            headers["Authorization"], "Bearer tok"
+        )
+        mock_conn.assert_called_once()
+        mock_run.assert_called_once()
+
+    @patch("add_repo.http.client.HTTPSConnection")
+    @patch(
+        "add_repo.subprocess.run",
+        side_effect=FileNotFoundError("gh"),
+    )
+    def test_missing_gh_cli_goes_unauthenticated(
+        self, mock_run, mock_conn
+    ):
+        mock_conn.return_value.getresponse.return_value = (
+            self._response({"C": 10})
+        )
+        client = GitHubClient(direct=True)
+        self.assertEqual(
+            client.api("repos/x/y/languages"), {"C": 10}
+        )
+        headers = mock_conn.return_value.request.call_args.kwargs[
+            "headers"
+        ]
+        self.assertNotIn("Authorization", headers)
+
+    @patch("add_repo.http.client.HTTPSConnection")
+    @patch("add_repo.subprocess.run")
+    def test_error_status_returns_none(
+        self, mock_run, mock_conn
+    ):
+        mock_run.return_value = _mock_proc(
+            returncode=1, stdout="",
+        )
+        resp = self._response({"message": "Not Found"})
+        resp.status = 404
+        mock_conn.return_value.getresponse.return_value = (
+            resp
+        )
+        client = GitHubClient(direct=True)
+        self.assertIsNone(client.api("repos/x/missing"))
+
+    @patch("add_repo.http.client.HTTPSConnection")
+    @patch("add_repo.subprocess.run")
+    def test_file_content_uses_raw_media_type(
+        self, mock_run, mock_conn
+    ):
+        mock_run.return_value = _mock_proc(
+            returncode=0, stdout="tok\n",
+        )
+        resp = self._response(None)
+        resp.read.return_value = b"AC_INIT([x])\n"
+        conn = mock_conn.return_value
+        conn.getresponse.return_value = resp
+        client = GitHubClient(direct=True)
+        content = client.get_file_content(
+            "x/y", "configure.ac", "main"
+        )
+        self.assertEqual(content, "AC_INIT([x])\n")
+        headers = conn.request.call_args.kwargs["headers"]
+        self.assertEqual(
+            headers["Accept"],
+            GitHubClient.RAW_MEDIA_TYPE,
+        )
+
+    @patch("add_repo.http.client.HTTPSConnection")
+    @patch("add_repo.subprocess.run")
+    def test_etag_cache_round_trip(self, mock_run, mock_conn):
+        mock_run.return_value = _mock_proc(
+            returncode=0, stdout="tok\n",
+        )
+        fresh = self._response({"C": 10})
+        fresh.getheader.side_effect = (
+            lambda name, default="": (
+                '"abc"' if name == "ETag" else default
+            )
+        )
+        conn = mock_conn.return_value
+        conn.getresponse.return_value = fresh
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = Path(tmpdir) / "gh_cache.json"
+            client = GitHubClient(
+                direct=True, cache_file=cache_file,
+            )
+            client.api("repos/x/y/languages")
+            client.save_cache()
+            self.assertTrue(cache_file.exists())
+
+            not_modified = self._response(None)
+            not_modified.status = 304
+            conn.getresponse.return_value = not_modified
+            client = GitHubClient(
+                direct=True, cache_file=cache_file,
+            )
+            result = client.api("repos/x/y/languages")
+        self.assertEqual(result, {"C": 10})
+        headers = conn.request.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"abc"')
+        self.assertEqual(
+            client.cache_stats(), {"hits": 1, "misses": 0}
+        )
+
+    def test_etag_cache_loaded_once_across_threads(self):
+        def slow_read(path):
+            time.sleep(0.01)
+            return {}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = Path(tmpdir) / "gh_cache.json"
+            cache_file.write_text("{}")
+            client = GitHubClient(
+                direct=True, cache_file=cache_file,
+            )
+            with patch(
+                "add_repo.JsonCache.read", side_effect=slow_read,
+            ) as mock_read, ThreadPoolExecutor(4) as pool:
+                caches = list(pool.map(
+                    lambda _: client._etag_cache(), range(4)
+                ))
+        mock_read.assert_called_once()
+        for cache in caches:
+            self.assertIs(cache, caches[0])
+
+
+class TestGitHubClientRepoBundle(unittest.TestCase):
+    """Tests for GitHubClient.graphql() / get_repo_bundle()."""
+
+    @patch("add_repo.subprocess.run")
+    def test_bundle_normalized(self, mock_run):
+        mock_run.return_value = _mock_proc(
             returncode=0,
-            stdout=json.dumps([
-                {
-                    "fullName": "someone/curl-wrapper",
-                    "language": "C",
-                    "stargazersCount": 100,
-                },
-                {
-                    "fullName": "curl/curl",
-                    "language": "C",
-                    "stargazersCount": 40000,
-                },
-            ]),
+            stdout=json.dumps({"data": {"repository": {
+                "nameWithOwner": "curl/curl",
+                "description": "A URL tool",
+                "url": "https://github.com/curl/curl",
+                "stargazerCount": 100,
+                "defaultBranchRef": {"name": "master"},
+                "primaryLanguage": {"name": "C"},
+                "languages": {"edges": [
+                    {"size": 900, "node": {"name": "C"}},
+                    {"size": 50, "node": {"name": "Perl"}},
+                ]},
+                "root": {"entries": [
+                    {"name": "configure.ac"},
+                    {"name": "src"},
+                ]},
+                "src": {"entries": [{"name": "main.c"}]},
+                "lib": None,
+                "auto": None,
+            }}}),
+        )
+        bundle = GitHubClient().get_repo_bundle("curl/curl")
+        self.assertEqual(bundle["info"], {
+            "fullName": "curl/curl",
+            "description": "A URL tool",
+            "url": "https://github.com/curl/curl",
+            "stargazersCount": 100,
+            "defaultBranch": "master",
+            "language": "C",
+        })
+        self.assertEqual(
+            bundle["languages"], {"C": 900, "Perl": 50}
         )
-        client = GitHubClient()
-        result = client.search_repos("curl")
         self.assertEqual(
-            result["fullName"], "curl/curl"
+            bundle["tree"],
+            ["configure.ac", "src", "src/main.c"],
         )
+        cmd = mock_run.call_args.args[0]
+        self.assertEqual(cmd[:3], ["gh", "api", "graphql"])
+        self.assertIn("owner=curl", cmd)
+        self.assertIn("name=curl", cmd)
 
     @patch("add_repo.subprocess.run")
-    def test_c_repos_preferred(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_graphql_errors_return_none(self, mock_run):
+        mock_run.return_value = _mock_proc(
             returncode=0,
-            stdout=json.dumps([
-                {
-                    "fullName": "js/mylib",
-                    "language": "JavaScript",
-                    "stargazersCount": 50000,
-                },
-                {
-                    "fullName": "c/mylib",
-                    "language": "C",
-                    "stargazersCount": 1000,
-                },
-            ]),
+            stdout=json.dumps({
+                "data": {"repository": None},
+                "errors": [{"message": "not found"}],
+            }),
+        )
+        self.assertIsNone(
+            GitHubClient().get_repo_bundle("x/missing")
         )
+
+    def test_fetch_uses_bundle_for_owner_repo(self):
+        client = GitHubClient()
+        bundle = {"info": {}, "tree": ["Makefile"]}
+        with patch.object(
+            client, "get_repo_bundle", return_value=bundle,
+        ) as mock_bundle, patch.object(
+            client, "get_repo_info",
+        ) as mock_info:
+            result = client.fetch_repo_bundle(
+                "https://github.com/curl/curl"
+            )
+        self.assertIs(result, bundle)
+        mock_bundle.assert_called_once_with("curl/curl")
+        mock_info.assert_not_called()
+
+    def test_fetch_bare_name_falls_back(self):
         client = GitHubClient()
-        result = client.search_repos("mylib")
+        info = {
+            "fullName": "curl/curl",
+            "defaultBranch": "master",
+        }
+        with patch.object(
+            client, "get_repo_bundle",
+        ) as mock_bundle, patch.object(
+            client, "get_repo_info", return_value=info,
+        ), patch.object(
+            client, "get_file_tree",
+            return_value=["Makefile"],
+        ) as mock_tree:
+            result = client.fetch_repo_bundle("curl")
+        self.assertEqual(
+            result, {"info": info, "tree": ["Makefile"]}
+        )
+        mock_bundle.assert_not_called()
+        mock_tree.assert_called_once_with(
+            "curl/curl", "master"
+        )
+
+
+# gh search repos output, serialized once for the
+# search_repos tests
+_SEARCH_CURL = json.dumps([
+    {
+        "fullName": "someone/curl-wrapper",
+        "language": "C",
+        "stargazersCount": 100,
+    },
+    {
+        "fullName": "curl/curl",
+        "language": "C",
+        "stargazersCount": 40000,
+    },
+])
+_SEARCH_MYLIB = json.dumps([
+    {
+        "fullName": "js/mylib",
+        "language": "JavaScript",
+        "stargazersCount": 50000,
+    },
+    {
+        "fullName": "c/mylib",
+        "language": "C",
+        "stargazersCount": 1000,
+    },
+])
+_SEARCH_STARS = json.dumps([
+    {
+        "fullName": "a/low",
+        "language": "C",
+        "stargazersCount": 10,
+    },
+    {
+        "fullName": "b/high",
+        "language": "C",
+        "stargazersCount": 50000,
+    },
+])
+_SEARCH_NON_C = json.dumps([
+    {
+        "fullName": "js/lib",
+        "language": "JavaScript",
+        "stargazersCount": 100,
+    },
+])
+
+
+class TestGitHubClientSearchRepos(unittest.TestCase):
+    """Tests for GitHubClient.search_repos()."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = GitHubClient()
+
+    def setUp(self):
+        patcher = patch("add_repo.subprocess.run")
+        self.mock_run = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_exact_name_match(self):
+        self.mock_run.return_value = _mock_proc(
+            returncode=0, stdout=_SEARCH_CURL,
+        )
+        result = self.client.search_repos("curl")
+        self.assertEqual(
+            result["fullName"], "curl/curl"
+        )
+
+    def test_c_repos_preferred(self):
+        self.mock_run.return_value = _mock_proc(
+            returncode=0, stdout=_SEARCH_MYLIB,
+        )
+        result = self.client.search_repos("mylib")
         self.assertEqual(
             result["fullName"], "c/mylib"
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_no_results(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_no_results(self):
+        self.mock_run.return_value = _mock_proc(
             returncode=0, stdout="[]",
         )
-        client = GitHubClient()
         self.assertIsNone(
-            client.search_repos("nonexistent")
+            self.client.search_repos("nonexistent")
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_gh_failure(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_gh_failure(self):
+        self.mock_run.return_value = _mock_proc(
             returncode=1, stdout="",
             stderr="auth required",
         )
-        client = GitHubClient()
         self.assertIsNone(
-            client.search_repos("curl")
+            self.client.search_repos("curl")
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_invalid_json(self, mock_run):
-        mock_run.return_value = MagicMock(
+    def test_invalid_json(self):
+        self.mock_run.return_value = _mock_proc(
             returncode=0, stdout="not json",
         )
-        client = GitHubClient()
         self.assertIsNone(
-            client.search_repos("curl")
+            self.client.search_repos("curl")
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_falls_back_to_highest_stars(
-        self, mock_run
-    ):
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout=json.dumps([
-                {
-                    "fullName": "a/low",
-                    "language": "C",
-                    "stargazersCount": 10,
-                },
-                {
-                    "fullName": "b/high",
-                    "language": "C",
-                    "stargazersCount": 50000,
-                },
-            ]),
+    def test_falls_back_to_highest_stars(self):
+        self.mock_run.return_value = _mock_proc(
+            returncode=0, stdout=_SEARCH_STARS,
         )
-        client = GitHubClient()
-        result = client.search_repos("nomatch")
+        result = self.client.search_repos("nomatch")
         self.assertEqual(
             result["fullName"], "b/high"
         )
 
-    @patch("add_repo.subprocess.run")
-    def test_non_c_repos_fallback(self, mock_run):
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout=json.dumps([
-                {
-                    "fullName": "js/lib",
-                    "language": "JavaScript",
-                    "stargazersCount": 100,
-                },
-            ]),
+    def test_non_c_repos_fallback(self):
+        self.mock_run.return_value = _mock_proc(
+            returncode=0, stdout=_SEARCH_NON_C,
         )
-        client = GitHubClient()
-        result = client.search_repos("lib")
+        result = self.client.search_repos("lib")
         self.assertEqual(
             result["fullName"], "js/lib"
         )
@@ -228,17 +611,7 @@ class TestGitHubClientNormalize(unittest.TestCase):
     """Tests for GitHubClient._normalize()."""
 
     def test_converts_api_response(self):
-        data = {
-            "full_name": "curl/curl",
-            "description": "transfer lib",
-            "html_url": (
-                "https://github.com/curl/curl"
-            ),
-            "stargazers_count": 40000,
-            "default_branch": "master",
-            "language": "C",
-        }
-        result = GitHubClient._normalize(data)
+        result = GitHubClient._normalize(_CURL_API)
         self.assertEqual(
             result["fullName"], "curl/curl"
         )
@@ -270,22 +643,15 @@ def test_handles_missing_fields(self):
 class TestGitHubClientGetRepoInfo(unittest.TestCase):
     """Tests for GitHubClient.get_repo_info()."""
 
+    @classmethod
+    def setUpClass(cls):
+        cls.client = GitHubClient()
+
     def test_full_url(self):
-        client = GitHubClient()
         with patch.object(
-            client, "api",
-            return_value={
-                "full_name": "curl/curl",
-                "description": "transfer lib",
-                "html_url": (
-                    "https://github.com/curl/curl"
-                ),
-                "stargazers_count": 40000,
-                "default_branch": "master",
-                "language": "C",
-            },
+            self.client, "api", return_value=_CURL_API,
         ):
-            result = client.get_repo_info(
+            result = self.client.get_repo_info(
                 "https://github.com/curl/curl"
             )
         self.assertEqual(
@@ -293,21 +659,10 @@ def test_full_url(self):
         )
 
     def test_owner_repo(self):
-        client = GitHubClient()
         with patch.object(
-            client, "api",
-            return_value={
-                "full_name": "curl/curl",
-                "description": "transfer lib",
-                "html_url": (
-                    "https://github.com/curl/curl"
-                ),
-                "stargazers_count": 40000,
-                "default_branch": "master",
-                "language": "C",
-            },
+            self.client, "api", return_value=_CURL_API,
         ):
-            result = client.get_repo_info(
+            result = self.client.get_repo_info(
                 "curl/curl"
             )
         self.assertEqual(
@@ -315,46 +670,43 @@ def test_owner_repo(self):
         )
 
     def test_plain_name_searches(self):
-        client = GitHubClient()
         with patch.object(
-            client, "search_repos",
+            self.client, "search_repos",
             return_value={
                 "fullName": "curl/curl",
                 "defaultBranch": "master",
             },
         ) as mock_search:
-            result = client.get_repo_info("curl")
+            result = self.client.get_repo_info("curl")
         mock_search.assert_called_once_with("curl")
         self.assertEqual(
             result["fullName"], "curl/curl"
         )
 
     def test_url_api_failure_falls_to_search(self):
-        client = GitHubClient()
         with patch.object(
-            client, "api", return_value=None
+            self.client, "api", return_value=None
         ):
             with patch.object(
-                client, "search_repos",
+                self.client, "search_repos",
                 return_value={
                     "fullName": "curl/curl"
                 },
             ) as mock_search:
-                client.get_repo_info(
+                self.client.get_repo_info(
                     "https://github.com/curl/curl"
                 )
         mock_search.assert_called_once()
 
     def test_owner_repo_api_failure(self):
-        client = GitHubClient()
         with patch.object(
-            client, "api", return_value=None
+            self.client, "api", return_value=None
         ):
             with patch.object(
-                client, "search_repos",
+                self.client, "search_repos",
                 return_value=None,
             ) as mock_search:
-                client.get_repo_info("bad/repo")
+                self.client.get_repo_info("bad/repo")
         mock_search.assert_called_once_with(
             "bad/repo"
         )
@@ -363,8 +715,11 @@ def test_owner_repo_api_failure(self):
 class TestGitHubClientGetFileTree(unittest.TestCase):
     """Tests for GitHubClient.get_file_tree()."""
 
+    @classmethod
+    def setUpClass(cls):
+        cls.client = GitHubClient()
+
     def test_collects_files(self):
-        client = GitHubClient()
 
         def side_effect(url):
             is_root = (
@@ -388,10 +743,10 @@ def side_effect(url):
             return None
 
         with patch.object(
-            client, "api",
+            self.client, "api",
             side_effect=side_effect,
         ):
-            files = client.get_file_tree(
+            files = self.client.get_file_tree(
                 "test/repo", "main"
             )
         self.assertIn("configure.ac", files)
@@ -399,17 +754,74 @@ def side_effect(url):
         self.assertIn("src/main.c", files)
 
     def test_returns_empty_on_failure(self):
-        client = GitHubClient()
         with patch.object(
-            client, "api", return_value=None
+            self.client, "api", return_value=None
         ):
-            files = client.get_file_tree(
+            files = self.client.get_file_tree(
                 "bad/repo", "main"
             )
         self.assertEqual(files, [])
 
+    def test_skips_missing_subdirs(self):
+        with patch.object(
+            self.client, "api",
+            side_effect=[None, [{"name": "Makefile"}]],
+        ) as mock_api:
+            files = self.client.get_file_tree(
+                "test/repo", "main"
+            )
+        self.assertEqual(files, ["Makefile"])
+        # git tree attempt + root listing only
+        self.assertEqual(mock_api.call_count, 2)
+
+    def test_recursive_tree_single_call(self):
+        tree = {
+            "truncated": False,
+            "tree": [
+                {"path": "Makefile.am", "type": "blob"},
+                {"path": "docs", "type": "tree"},
+                {"path": "docs/x.md", "type": "blob"},
+                {"path": "lib", "type": "tree"},
+                {"path": "lib/a.c", "type": "blob"},
+                {"path": "src", "type": "tree"},
+                {"path": "src/main.c", "type": "blob"},
+                {"path": "src/sub", "type": "tree"},
+                {"path": "src/sub/b.c", "type": "blob"},
+            ],
+        }
+        with patch.object(
+            self.client, "api", return_value=tree,
+        ) as mock_api:
+            files = self.client.get_file_tree(
+                "test/repo", "main"
+            )
+        self.assertEqual(files, [
+            "Makefile.am", "docs", "lib", "src",
+            "src/main.c", "src/sub", "lib/a.c",
+        ])
+        mock_api.assert_called_once_with(
+            "repos/test/repo/git/trees/main"
+            "?recursive=1"
+        )
+
+    def test_truncated_tree_falls_back(self):
+        def side_effect(url):
+            if "git/trees" in url:
+                return {"truncated": True, "tree": []}
+            if url.endswith("contents?ref=main"):
+                return [{"name": "configure"}]
+            return None
+
+        with patch.object(
+            self.client, "api",
+            side_effect=side_effect,
+        ):
+            files = self.client.get_file_tree(
+                "test/repo", "main"
+            )
+        self.assertEqual(files, ["configure"])
+
     def test_auto_dir_scanned(self):
-        client = GitHubClient()
 
         def side_effect(url):
             is_root = (
@@ -432,10 +844,10 @@ def side_effect(url):
             return None
 
         with patch.object(
-            client, "api",
+            self.client, "api",
             side_effect=side_effect,
         ):
-            files = client.get_file_tree(
+            files = self.client.get_file_tree(
                 "nginx/nginx", "master"
             )
         self.assertIn("auto/configure", files)
@@ -483,19 +895,35 @@ def test_returns_none_on_no_content(self):
             )
         self.assertIsNone(result)
 
+    def test_memoizes_per_path(self):
+        client = GitHubClient()
+        encoded = base64.b64encode(b"x").decode()
+        with patch.object(
+            client, "api",
+            return_value={"content": encoded},
+        ) as mock_api:
+            for _ in range(2):
+                client.get_file_content(
+                    "test/repo", "a.txt", "main"
+                )
+        mock_api.assert_called_once()
+
 
 class TestGitHubClientGetLanguages(
     unittest.TestCase
 ):
     """Tests for GitHubClient.get_languages()."""
 
+    @classmethod
+    def setUpClass(cls):
+        cls.client = GitHubClient()
+
     def test_returns_language_data(self):
-        client = GitHubClient()
         with patch.object(
-            client, "api",
+            self.client, "api",
             return_value={"C": 400000},
         ):
-            result = client.get_languages(
+            result = self.client.get_languages(
                 "curl/curl"
             )
         self.assertEqual(result, {"C": 400000})
@@ -505,99 +933,59 @@ def test_returns_language_data(self):
 # BuildSystemDetector
 # ============================================================
 
-class TestBuildSystemDetector(unittest.TestCase):
-    """Tests for BuildSystemDetector."""
-
-    def _detector(self):
-        from data_loader import DataLoader
-        indicators = DataLoader().load_build_systems()
-        return BuildSystemDetector(indicators)
-
-    def test_autoconf(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["configure.ac", "Makefile.am"]),
-            "autoconf",
-        )
-
-    def test_autoconf_in(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["configure.in", "Makefile"]),
-            "autoconf",
-        )
-
-    def test_cmake(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["CMakeLists.txt", "src/main.c"]),
-            "cmake",
-        )
-
-    def test_meson(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["meson.build", "src/main.c"]),
-            "meson",
-        )
-
-    def test_perl_configure_capital(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["Configure", "Makefile"]),
-            "perl-configure",
-        )
+class TestFileIndex(unittest.TestCase):
+    """Tests for FileIndex."""
 
-    def test_perl_configure_config(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["config", "Makefile"]),
-            "perl-configure",
-        )
+    def test_behaves_like_list(self):
+        files = ["configure.ac", "src", "src/main.c"]
+        idx = FileIndex(files)
+        self.assertEqual(list(idx), files)
+        self.assertEqual(len(idx), 3)
+        self.assertIn("src/main.c", idx)
+        self.assertNotIn("main.c", idx)
 
-    def test_auto_configure(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["auto/configure", "src/core"]),
-            "auto-configure",
+    def test_has_dir_needs_nested_path(self):
+        self.assertFalse(FileIndex(["src"]).has_dir("src"))
+        self.assertTrue(
+            FileIndex(["src/a.c"]).has_dir("src")
         )
 
-    def test_configure_only(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["configure", "Makefile"]),
-            "configure-only",
-        )
+    def test_of_reuses_index(self):
+        idx = FileIndex(["a"])
+        self.assertIs(FileIndex.of(idx), idx)
 
-    def test_configure_before_makefile(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["Makefile", "configure"]),
-            "configure-only",
-        )
 
-    def test_make_only(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["Makefile", "src/main.c"]),
-            "make-only",
-        )
+class TestBuildSystemDetector(unittest.TestCase):
+    """Tests for BuildSystemDetector."""
 
-    def test_unknown(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect(["README.md", "src/main.rs"]),
-            "unknown",
-        )
+    @classmethod
+    def setUpClass(cls):
+        from data_loader import DataLoader
+        indicators = DataLoader().load_build_systems()
+        cls.detector = BuildSystemDetector(indicators)
+
+    # (files, expected build system)
+    CASES = (
+        (["configure.ac", "Makefile.am"], "autoconf"),
+        (["configure.in", "Makefile"], "autoconf"),
+        (["CMakeLists.txt", "src/main.c"], "cmake"),
+        (["meson.build", "src/main.c"], "meson"),
+        (["Configure", "Makefile"], "perl-configure"),
+        (["config", "Makefile"], "perl-configure"),
+        (["auto/configure", "src/core"], "auto-configure"),
+        (["configure", "Makefile"], "configure-only"),
+        (["Makefile", "configure"], "configure-only"),
+        (["Makefile", "src/main.c"], "make-only"),
+        (["README.md", "src/main.rs"], "unknown"),
+        (["configure.ac", "CMakeLists.txt"], "autoconf"),
+    )
 
-    def test_autoconf_priority_over_cmake(self):
-        d = self._detector()
-        self.assertEqual(
-            d.detect([
-                "configure.ac", "CMakeLists.txt",
-            ]),
-            "autoconf",
-        )
+    def test_detect(self):
+        for files, expected in self.CASES:
+            with self.subTest(files=files):
+                self.assertEqual(
+                    self.detector.detect(files), expected
+                )
 
     def test_empty_indicators(self):
         d = BuildSystemDetector([])
@@ -606,6 +994,14 @@ def test_empty_indicators(self):
         )
 
 
+def _fake_github(api_return=None, file_content=None):
+    """Cheap GitHubClient stand-in returning fixed values."""
+    return SimpleNamespace(
+        api=lambda *a, **kw: api_return,
+        get_file_content=lambda *a, **kw: file_content,
+    )
+
+
 # ============================================================
 # DependencyAnalyzer
 # ============================================================
@@ -616,11 +1012,9 @@ class TestDependencyAnalyzer(unittest.TestCase):
     def _analyzer(self, file_content=None):
         from data_loader import DataLoader
         deps = DataLoader().load_dependencies()
-        github = MagicMock()
-        github.get_file_content.return_value = (
-            file_content
+        return DependencyAnalyzer(
+            deps, _fake_github(file_content=file_content)
         )
-        return DependencyAnalyzer(deps, github)
 
     def test_autoconf_detects_openssl(self):
         a = self._analyzer(
@@ -743,11 +1137,9 @@ class TestBinaryDetector(unittest.TestCase):
     """Tests for BinaryDetector."""
 
     def _detector(self, file_content=None):
-        github = MagicMock()
-        github.get_file_content.return_value = (
-            file_content
+        return BinaryDetector(
+            _fake_github(file_content=file_content)
         )
-        return BinaryDetector(github)
 
     def test_fallback_with_src(self):
         d = self._detector()
@@ -806,13 +1198,34 @@ class TestBuildStepGenerator(unittest.TestCase):
     def setUp(self):
         self.gen = BuildStepGenerator()
 
-    def test_autoconf_no_flags(self):
-        steps = self.gen.generate("autoconf", [])
-        self.assertEqual(steps, [
+    # Steps for each build system with no flags
+    STEPS = {
+        "autoconf": [
             "autoreconf -fi",
             "./configure",
             "make -j$(nproc)",
-        ])
+        ],
+        "cmake": [
+            "mkdir -p build && cd build && cmake ..",
+            "make -C build -j$(nproc)",
+        ],
+        "meson": ["meson setup build", "ninja -C build"],
+        "perl-configure": ["./config", "make -j$(nproc)"],
+        "auto-configure": [
+            "auto/configure", "make -j$(nproc)",
+        ],
+        "configure-only": [
+            "./configure", "make -j$(nproc)",
+        ],
+        "make-only": ["make -j$(nproc)"],
+    }
+
+    def test_no_flags(self):
+        for bs, expected in self.STEPS.items():
+            with self.subTest(build_system=bs):
+                self.assertEqual(
+                    self.gen.generate(bs, []), expected
+                )
 
     def test_autoconf_with_flags(self):
         steps = self.gen.generate(
@@ -824,13 +1237,6 @@ def test_autoconf_with_flags(self):
             "./configure --with-openssl --with-zlib",
         )
 
-    def test_cmake_no_flags(self):
-        steps = self.gen.generate("cmake", [])
-        self.assertEqual(steps, [
-            "mkdir -p build && cd build && cmake ..",
-            "make -C build -j$(nproc)",
-        ])
-
     def test_cmake_with_flags(self):
         steps = self.gen.generate(
             "cmake", ["-DCMAKE_USE_OPENSSL=ON"],
@@ -839,37 +1245,6 @@ def test_cmake_with_flags(self):
             "-DCMAKE_USE_OPENSSL=ON", steps[0]
         )
 
-    def test_meson(self):
-        steps = self.gen.generate("meson", [])
-        self.assertEqual(steps, [
-            "meson setup build",
-            "ninja -C build",
-        ])
-
-    def test_perl_configure(self):
-        steps = self.gen.generate(
-            "perl-configure", []
-        )
-        self.assertEqual(steps, [
-            "./config", "make -j$(nproc)",
-        ])
-
-    def test_auto_configure(self):
-        steps = self.gen.generate(
-            "auto-configure", []
-        )
-        self.assertEqual(steps, [
-            "auto/configure", "make -j$(nproc)",
-        ])
-
-    def test_configure_only(self):
-        steps = self.gen.generate(
-            "configure-only", []
-        )
-        self.assertEqual(steps, [
-            "./configure", "make -j$(nproc)",
-        ])
-
     def test_configure_only_with_flags(self):
         steps = self.gen.generate(
             "configure-only", ["--enable-libx264"],
@@ -879,38 +1254,63 @@ def test_configure_only_with_flags(self):
             "./configure --enable-libx264",
         )
 
-    def test_make_only(self):
-        steps = self.gen.generate("make-only", [])
-        self.assertEqual(
-            steps, ["make -j$(nproc)"]
-        )
-
     def test_unknown(self):
         steps = self.gen.generate("unknown", [])
         self.assertEqual(len(steps), 2)
         self.assertIn("TODO", steps[0])
 
     def test_last_step_is_make_or_ninja(self):
-        for bs in [
-            "autoconf", "cmake", "configure-only",
-            "make-only", "perl-configure",
-            "auto-configure", "unknown",
-        ]:
-            steps = self.gen.generate(bs, [])
-            last = steps[-1]
-            self.assertTrue(
-                "make" in last or "ninja" in last,
-                f"Last step for {bs}: {last}",
-            )
+        for bs in [*self.STEPS, "unknown"]:
+            with self.subTest(build_system=bs):
+                last = self.gen.generate(bs, [])[-1]
+                self.assertTrue(
+                    "make" in last or "ninja" in last
+                )
 
 
 # ============================================================
 # ConfigGenerator
 # ============================================================
 
+class _MemoryFiles(dict):
+    """In-memory files keyed by path, with an open() lookalike."""
+
+    def open(self, path, mode="r", encoding=None):
+        if "w" in mode:
+            return _MemoryFile(self, path)
+        if path not in self:
+            raise FileNotFoundError(path)
+        return io.StringIO(self[path])
+
+
+class _MemoryFile(io.StringIO):
+    """Writable StringIO that stores its text on close()."""
+
+    def __init__(self, files, path):
+        super().__init__()
+        self._files = files
+        self._path = path
+
+    def close(self):
+        if not self.closed:
+            self._files[self._path] = self.getvalue()
+        super().close()
+
+
 class TestConfigGenerator(unittest.TestCase):
     """Tests for ConfigGenerator."""
 
+    @classmethod
+    def setUpClass(cls):
+        # One scratch directory for the whole class; each
+        # test works under a name of its own inside it
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
     def test_generate_entry(self):
         gen = ConfigGenerator()
         repo_info = {
@@ -977,16 +1377,15 @@ def test_generate_entry_empty_apt_deps(self):
         self.assertNotIn("apt_deps", entry)
 
     def test_write_entry_new_repo(self):
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".yaml", delete=False,
-        ) as f:
-            yaml.dump(
-                {"repos": {"existing": {"url": "x"}}},
-                f,
-            )
-            tmp_path = Path(f.name)
-
-        gen = ConfigGenerator(config_path=tmp_path)
+        files = _MemoryFiles({
+            "config.yaml": (
+                "repos:\n  existing:\n    url: x\n"
+            ),
+        })
+        gen = ConfigGenerator(
+            config_path="config.yaml",
+            opener=files.open,
+        )
         entry = {
             "url": (
                 "https://github.com/madler/zlib.git"
@@ -999,68 +1398,67 @@ def test_write_entry_new_repo(self):
         }
         gen.write_entry("zlib", entry)
 
-        with open(
-            tmp_path, "r", encoding="utf-8"
-        ) as fh:
-            result = yaml.safe_load(fh)
+        result = yaml.safe_load(files["config.yaml"])
         self.assertIn("zlib", result["repos"])
         self.assertIn("existing", result["repos"])
         self.assertEqual(
             result["repos"]["zlib"]["branch"],
             "develop",
         )
-        tmp_path.unlink()
 
     def test_write_entry_overwrites_warns(self):
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".yaml", delete=False,
-        ) as f:
-            yaml.dump(
-                {"repos": {"curl": {"url": "old"}}},
-                f,
-            )
-            tmp_path = Path(f.name)
-
-        gen = ConfigGenerator(config_path=tmp_path)
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
+        files = _MemoryFiles({
+            "config.yaml": (
+                "repos:\n  curl:\n    url: old\n"
             ),
-        ):
+        })
+        gen = ConfigGenerator(
+            config_path="config.yaml",
+            opener=files.open,
+        )
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             gen.write_entry("curl", {"url": "new"})
 
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("WARN", output)
         self.assertIn("curl", output)
 
+        result = yaml.safe_load(files["config.yaml"])
+        self.assertEqual(
+            result["repos"]["curl"]["url"], "new"
+        )
+
+    def test_write_entry_real_file(self):
+        tmp_path = self.tmp / f"{self._testMethodName}.yaml"
+        tmp_path.write_text("repos: {}\n")
+
+        ConfigGenerator(config_path=tmp_path).write_entry(
+            "zlib", {"url": "x"}
+        )
         with open(
             tmp_path, "r", encoding="utf-8"
         ) as fh:
             result = yaml.safe_load(fh)
         self.assertEqual(
-            result["repos"]["curl"]["url"], "new"
+            result["repos"]["zlib"]["url"], "x"
         )
-        tmp_path.unlink()
 
     def test_create_output_dirs(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmp = Path(tmpdir)
-            # Simulate the logic of create_output_dirs
-            dirs = [
-                tmp / "output" / "omnibor" / "test",
-                tmp / "output" / "spdx" / "test",
-                tmp / "output" / "binary-scan"
-                / "test",
-                tmp / "docs" / "test",
-            ]
-            for d in dirs:
-                d.mkdir(parents=True, exist_ok=True)
-            for d in dirs:
-                self.assertTrue(d.exists())
+        tmp = self.tmp / self._testMethodName
+        with contextlib.redirect_stdout(io.StringIO()):
+            ConfigGenerator.create_output_dirs(
+                "test", base=tmp
+            )
+        dirs = [
+            tmp / "output" / "omnibor" / "test",
+            tmp / "output" / "spdx" / "test",
+            tmp / "output" / "binary-scan"
+            / "test",
+            tmp / "docs" / "test",
+        ]
+        for d in dirs:
+            self.assertTrue(d.exists())
 
     def test_get_repo_stats(self):
         github = MagicMock()
@@ -1073,6 +1471,14 @@ def test_get_repo_stats(self):
         self.assertIn("K LoC", result)
         self.assertIn("C", result)
 
+    def test_get_repo_stats_uses_given_languages(self):
+        github = MagicMock()
+        result = ConfigGenerator.get_repo_stats(
+            "curl/curl", github, {"C": 400000},
+        )
+        self.assertEqual(result, "~10K LoC, C")
+        github.get_languages.assert_not_called()
+
     def test_get_repo_stats_empty(self):
         github = MagicMock()
         github.get_languages.return_value = None
@@ -1094,7 +1500,7 @@ def test_build_description_short(self):
             "description": "A URL transfer library"
         }
         result = RepoDiscovery.build_description(
-            info, "~170K LoC, C", "curl"
+            info["description"], "~170K LoC, C", "curl"
         )
         self.assertIn(
             "A URL transfer library", result
@@ -1104,15 +1510,15 @@ def test_build_description_short(self):
     def test_build_description_long(self):
         info = {"description": "A" * 100}
         result = RepoDiscovery.build_description(
-            info, "", "curl"
+            info["description"], "", "curl"
         )
-        self.assertIn("...", result)
+        self.assertIn(_Needles.ELLIPSIS, result)
         self.assertTrue(len(result) <= 65)
 
     def test_build_description_empty(self):
         info = {"description": ""}
         result = RepoDiscovery.build_description(
-            info, "", "curl"
+            info["description"], "", "curl"
         )
         self.assertEqual(result, "curl")
 
@@ -1121,28 +1527,77 @@ def test_build_description_no_stats(self):
             "description": "A URL transfer library"
         }
         result = RepoDiscovery.build_description(
-            info, "", "curl"
+            info["description"], "", "curl"
         )
         self.assertEqual(
             result, "A URL transfer library"
         )
 
+    def test_build_description_none(self):
+        result = RepoDiscovery.build_description(
+            None, "", "curl"
+        )
+        self.assertEqual(result, "curl")
+
+
+class TestDockerfilePackages(unittest.TestCase):
+    """Tests for _dockerfile_packages()."""
+
+    def tearDown(self):
+        add_repo._dockerfile_packages.cache_clear()
+
+    def test_words_and_pins(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            df = Path(tmpdir) / "Dockerfile"
+            df.write_text(
+                "RUN apt-get install -y \\\n"
+                "    libssl-dev=3.0.2 \\\n"
+                "    libfoo-dev-extra\n"
+            )
+            pkgs = add_repo._dockerfile_packages(df)
+        self.assertIn("libssl-dev", pkgs)
+        self.assertNotIn("libfoo-dev", pkgs)
+
+    def test_missing_file(self):
+        self.assertEqual(
+            add_repo._dockerfile_packages(
+                Path("/nonexistent/Dockerfile")
+            ),
+            frozenset(),
+        )
+
+    def test_opener(self):
+        files = _MemoryFiles({"Dockerfile": "libssl-dev"})
+        self.assertEqual(
+            add_repo._dockerfile_packages(
+                "Dockerfile", files.open
+            ),
+            frozenset({"libssl-dev"}),
+        )
+
 
 # ============================================================
 # main() CLI
 # ============================================================
 
 def _mock_discovery():
-    """Create a RepoDiscovery with all mocked components."""
-    github = MagicMock()
-    data_loader = MagicMock()
+    """Create a RepoDiscovery with all mocked components.
+
+    Each component is specced against its real class so
+    only its actual methods exist on the mock.
+    """
+    github = Mock(spec=GitHubClient)
+    data_loader = Mock(spec=DataLoader)
     data_loader.load_build_systems.return_value = []
     data_loader.load_dependencies.return_value = {}
-    detector = MagicMock()
-    analyzer = MagicMock()
-    binary_detector = MagicMock()
-    step_gen = MagicMock()
-    config_gen = MagicMock()
+    github.cache_stats.return_value = {
+        "hits": 0, "misses": 0,
+    }
+    detector = Mock(spec=BuildSystemDetector)
+    analyzer = Mock(spec=DependencyAnalyzer)
+    binary_detector = Mock(spec=BinaryDetector)
+    step_gen = Mock(spec=BuildStepGenerator)
+    config_gen = Mock(spec=ConfigGenerator)
 
     discovery = RepoDiscovery(
         github=github,
@@ -1152,28 +1607,70 @@ def _mock_discovery():
         binary_detector=binary_detector,
         step_generator=step_gen,
         config_generator=config_gen,
+        dockerfile_path="Dockerfile",
     )
     return discovery
 
 
-class TestMainDryRun(unittest.TestCase):
+class _MainTestCase(unittest.TestCase):
+    """Base for main() tests: one mocked RepoDiscovery per class.
+
+    add_repo.RepoDiscovery is patched for the whole class;
+    setUp clears the return values the previous test set.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.discovery = _mock_discovery()
+        cls._patcher = patch(
+            "add_repo.RepoDiscovery",
+            return_value=cls.discovery,
+        )
+        cls._patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+
+    def setUp(self):
+        add_repo._dockerfile_packages.cache_clear()
+        d = self.discovery
+        for part in (
+            d.github, d.detector, d.analyzer,
+            d.binary_detector, d.steps, d.config,
+        ):
+            part.reset_mock(
+                return_value=True, side_effect=True
+            )
+        d.github.cache_stats.return_value = {
+            "hits": 0, "misses": 0,
+        }
+        # No Dockerfile unless a test provides one
+        d.opener = _MemoryFiles().open
+
+    def run_main(self):
+        """Run add_repo.main() and return what it printed."""
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            add_repo.main()
+        return buf.getvalue()
+
+
+class TestMainDryRun(_MainTestCase):
     """Tests for main() in dry-run mode."""
 
-    @patch("add_repo.RepoDiscovery")
     @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_dry_run_success(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "A URL transfer library",
+    def test_dry_run_success(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": {
+                **_CURL_INFO,
+                "description": "A URL transfer library",
+            },
+            "tree": [
+                "configure.ac", "Makefile", "src/main.c",
+            ],
         }
-        d.github.get_file_tree.return_value = [
-            "configure.ac", "Makefile", "src/main.c",
-        ]
         d.detector.detect.return_value = "autoconf"
         d.analyzer.analyze.return_value = (
             ["--with-openssl"], ["libssl-dev"]
@@ -1184,59 +1681,68 @@ def test_dry_run_success(self, mock_cls):
         d.config.get_repo_stats.return_value = (
             "~170K LoC, C"
         )
-        d.config.generate_entry.return_value = {
-            "url": (
-                "https://github.com/curl/curl.git"
-            ),
-            "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["src/curl"],
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY,
+            url="https://github.com/curl/curl.git",
+            output_binaries=["src/curl"],
+        )
+        d.steps.generate.return_value = ["make"]
+
+        d.opener = _MemoryFiles(
+            {"Dockerfile": "libssl-dev"}
+        ).open
+        self.run_main()
+
+    @patch("sys.argv", ["add_repo.py", "curl/curl"])
+    def test_bundle_languages_skip_languages_call(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": _CURL_INFO,
+            "languages": {"C": 400000},
+            "tree": ["configure.ac", "Makefile"],
         }
+        d.detector.detect.return_value = "autoconf"
+        d.analyzer.analyze.return_value = ([], [])
+        d.binary_detector.detect.return_value = ["curl"]
+        d.config.get_repo_stats.side_effect = (
+            ConfigGenerator.get_repo_stats
+        )
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY
+        )
         d.steps.generate.return_value = ["make"]
 
-        with patch("builtins.print"):
-            with patch(
-                "add_repo.Path.exists",
-                return_value=True,
-            ):
-                with patch(
-                    "add_repo.Path.read_text",
-                    return_value="libssl-dev",
-                ):
-                    add_repo.main()
+        self.run_main()
+
+        d.github.get_languages.assert_not_called()
+        d.config.generate_entry.assert_called_once()
+        description = (
+            d.config.generate_entry.call_args.args[-1]
+        )
+        self.assertIn("~10K LoC, C", description)
 
-    @patch("add_repo.RepoDiscovery")
     @patch(
         "sys.argv",
         ["add_repo.py", "nonexistent"],
     )
-    def test_repo_not_found_exits(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = None
-        with patch("builtins.print"):
+    def test_repo_not_found_exits(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = None
+        with contextlib.redirect_stdout(io.StringIO()):
             with self.assertRaises(
                 SystemExit
             ) as cm:
                 add_repo.main()
             self.assertEqual(cm.exception.code, 1)
 
-    @patch("add_repo.RepoDiscovery")
     @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_empty_tree_exits(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "test",
+    def test_empty_tree_exits(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": _CURL_INFO,
+            "tree": [],
         }
-        d.github.get_file_tree.return_value = []
-        with patch("builtins.print"):
+        with contextlib.redirect_stdout(io.StringIO()):
             with self.assertRaises(
                 SystemExit
             ) as cm:
@@ -1244,224 +1750,102 @@ def test_empty_tree_exits(self, mock_cls):
             self.assertEqual(cm.exception.code, 1)
 
 
-class TestMainWrite(unittest.TestCase):
+class TestMainWrite(_MainTestCase):
     """Tests for main() in --write mode."""
 
-    @patch("add_repo.RepoDiscovery")
     @patch(
         "sys.argv",
         ["add_repo.py", "curl", "--write"],
     )
-    def test_write_mode(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "A URL transfer library",
+    def test_write_mode(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": {
+                **_CURL_INFO,
+                "description": "A URL transfer library",
+            },
+            "tree": [
+                "configure.ac", "Makefile",
+            ],
         }
-        d.github.get_file_tree.return_value = [
-            "configure.ac", "Makefile",
-        ]
         d.detector.detect.return_value = "autoconf"
         d.analyzer.analyze.return_value = ([], [])
         d.binary_detector.detect.return_value = [
             "curl"
         ]
         d.config.get_repo_stats.return_value = ""
-        d.config.generate_entry.return_value = {
-            "url": (
-                "https://github.com/curl/curl.git"
-            ),
-            "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY,
+            url="https://github.com/curl/curl.git",
+        )
         d.steps.generate.return_value = ["make"]
 
-        with patch("builtins.print"):
-            add_repo.main()
+        self.run_main()
 
         d.config.write_entry.assert_called_once()
         d.config.create_output_dirs.assert_called_once()
 
 
-class TestMainWithAptPackages(unittest.TestCase):
+class TestMainWithAptPackages(_MainTestCase):
     """Test main() Dockerfile package checking."""
 
-    @patch("add_repo.RepoDiscovery")
     @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_new_packages_reported(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "test",
+    def test_dockerfile_package_report(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": _CURL_INFO,
+            "tree": [
+                "configure.ac", "Makefile",
+            ],
         }
-        d.github.get_file_tree.return_value = [
-            "configure.ac", "Makefile",
-        ]
         d.detector.detect.return_value = "autoconf"
-        d.analyzer.analyze.return_value = (
-            ["--with-openssl"],
-            ["libssl-dev", "libnew-dev"],
-        )
         d.binary_detector.detect.return_value = [
             "curl"
         ]
         d.config.get_repo_stats.return_value = ""
-        d.config.generate_entry.return_value = {
-            "url": "x", "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
-        d.steps.generate.return_value = ["make"]
-
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
-            with patch(
-                "add_repo.Path.exists",
-                return_value=True,
-            ):
-                with patch(
-                    "add_repo.Path.read_text",
-                    return_value="libssl-dev",
-                ):
-                    add_repo.main()
-
-        output = "\n".join(printed)
-        self.assertIn("libnew-dev", output)
-
-    @patch("add_repo.RepoDiscovery")
-    @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_all_packages_installed(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "test",
-        }
-        d.github.get_file_tree.return_value = [
-            "configure.ac", "Makefile",
-        ]
-        d.detector.detect.return_value = "autoconf"
-        d.analyzer.analyze.return_value = (
-            ["--with-openssl"], ["libssl-dev"],
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY
         )
-        d.binary_detector.detect.return_value = [
-            "curl"
-        ]
-        d.config.get_repo_stats.return_value = ""
-        d.config.generate_entry.return_value = {
-            "url": "x", "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
         d.steps.generate.return_value = ["make"]
 
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
+        installed = {"Dockerfile": "libssl-dev"}
+        cases = (
+            # (apt packages, Dockerfile, expected output)
+            (
+                ["libssl-dev", "libnew-dev"], installed,
+                _Needles.NEW_PKG,
             ),
-        ):
-            with patch(
-                "add_repo.Path.exists",
-                return_value=True,
-            ):
-                with patch(
-                    "add_repo.Path.read_text",
-                    return_value="libssl-dev",
-                ):
-                    add_repo.main()
-
-        output = "\n".join(printed)
-        self.assertIn("All required packages", output)
-
-    @patch("add_repo.RepoDiscovery")
-    @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_no_dockerfile(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "test",
-        }
-        d.github.get_file_tree.return_value = [
-            "configure.ac", "Makefile",
-        ]
-        d.detector.detect.return_value = "autoconf"
-        d.analyzer.analyze.return_value = (
-            ["--with-openssl"], ["libssl-dev"],
+            (["libssl-dev"], installed, _Needles.ALL_OK),
+            (["libssl-dev"], {}, _Needles.NONE_INSTALLED),
         )
-        d.binary_detector.detect.return_value = [
-            "curl"
-        ]
-        d.config.get_repo_stats.return_value = ""
-        d.config.generate_entry.return_value = {
-            "url": "x", "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
-        d.steps.generate.return_value = ["make"]
-
-        with patch("builtins.print"):
-            with patch(
-                "add_repo.Path.exists",
-                return_value=False,
+        for apt_packages, files, needle in cases:
+            with self.subTest(
+                apt_packages=apt_packages,
+                dockerfile=bool(files),
             ):
-                add_repo.main()
+                d.analyzer.analyze.return_value = (
+                    ["--with-openssl"], apt_packages,
+                )
+                d.opener = _MemoryFiles(files).open
+                output = self.run_main()
 
+                self.assertIn(needle, output)
 
-class TestMainDescriptionTruncation(
-    unittest.TestCase
-):
+
+class TestMainDescriptionTruncation(_MainTestCase):
     """Test description truncation in main()."""
 
-    @patch("add_repo.RepoDiscovery")
     @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_long_description(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "A" * 100,
+    def test_long_description(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": {
+                **_CURL_INFO, "description": "A" * 100,
+            },
+            "tree": [
+                "Makefile"
+            ],
         }
-        d.github.get_file_tree.return_value = [
-            "Makefile"
-        ]
         d.detector.detect.return_value = "make-only"
         d.analyzer.analyze.return_value = ([], [])
         d.binary_detector.detect.return_value = [
@@ -1470,111 +1854,64 @@ def test_long_description(self, mock_cls):
         d.config.get_repo_stats.return_value = (
             "~170K LoC, C"
         )
-        d.config.generate_entry.return_value = {
-            "url": "x", "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY
+        )
         d.steps.generate.return_value = ["make"]
 
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
-            add_repo.main()
-
-        output = "\n".join(printed)
-        self.assertIn("...", output)
+        output = self.run_main()
+        self.assertIn(_Needles.ELLIPSIS, output)
 
-    @patch("add_repo.RepoDiscovery")
     @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_no_description(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "",
+    def test_no_description(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": {
+                **_CURL_INFO, "description": "",
+            },
+            "tree": [
+                "Makefile"
+            ],
         }
-        d.github.get_file_tree.return_value = [
-            "Makefile"
-        ]
         d.detector.detect.return_value = "make-only"
         d.analyzer.analyze.return_value = ([], [])
         d.binary_detector.detect.return_value = [
             "curl"
         ]
         d.config.get_repo_stats.return_value = ""
-        d.config.generate_entry.return_value = {
-            "url": "x", "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY
+        )
         d.steps.generate.return_value = ["make"]
 
-        with patch("builtins.print"):
-            add_repo.main()
+        self.run_main()
 
 
-class TestMainNoFlags(unittest.TestCase):
+class TestMainNoFlags(_MainTestCase):
     """Test main() with no configure flags."""
 
-    @patch("add_repo.RepoDiscovery")
     @patch("sys.argv", ["add_repo.py", "curl"])
-    def test_no_flags_message(self, mock_cls):
-        d = _mock_discovery()
-        mock_cls.return_value = d
-        d.github.get_repo_info.return_value = {
-            "fullName": "curl/curl",
-            "defaultBranch": "master",
-            "stargazersCount": 40000,
-            "language": "C",
-            "description": "test",
+    def test_no_flags_message(self):
+        d = self.discovery
+        d.github.fetch_repo_bundle.return_value = {
+            "info": _CURL_INFO,
+            "tree": [
+                "Makefile"
+            ],
         }
-        d.github.get_file_tree.return_value = [
-            "Makefile"
-        ]
         d.detector.detect.return_value = "make-only"
         d.analyzer.analyze.return_value = ([], [])
         d.binary_detector.detect.return_value = [
             "curl"
         ]
         d.config.get_repo_stats.return_value = ""
-        d.config.generate_entry.return_value = {
-            "url": "x", "branch": "master",
-            "build_steps": ["make"],
-            "clean_cmd": "make clean",
-            "description": "test",
-            "output_binaries": ["curl"],
-        }
+        d.config.generate_entry.return_value = dict(
+            _DEFAULT_ENTRY
+        )
         d.steps.generate.return_value = ["make"]
 
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
-            add_repo.main()
-
-        output = "\n".join(printed)
-        self.assertIn(
-            "No optional dependency flags", output
-        )
+        output = self.run_main()
+        self.assertIn(_Needles.NO_FLAGS, output)
 
 
 if __name__ == "__main__":
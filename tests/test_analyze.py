@@ -5,6 +5,8 @@
 Uses unittest.mock to avoid real subprocess calls.
 """
 
+import contextlib
+import io
 import sys
 import tempfile
 import unittest
@@ -24,6 +26,27 @@
 )
 
 
+class _FakeRunner:
+    """CommandRunner stand-in that records each command.
+
+    codes is the exit code for every call, or a list of
+    exit codes returned one per call.
+    """
+
+    def __init__(self, codes=0):
+        self.calls = []
+        self._code = codes
+        self._codes = (
+            iter(codes) if isinstance(codes, list) else None
+        )
+
+    def run(self, cmd, cwd=None, description=""):
+        self.calls.append(cmd)
+        if self._codes is not None:
+            return next(self._codes)
+        return self._code
+
+
 # ============================================================
 # Utilities
 # ============================================================
@@ -114,17 +137,10 @@ def test_prints_error_on_failure(self, mock_run):
             returncode=42, stdout="",
         )
         runner = CommandRunner()
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             runner.run("bad", description="x")
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("42", output)
 
 
@@ -136,23 +152,22 @@ class TestDependencyValidator(unittest.TestCase):
     """Tests for DependencyValidator."""
 
     def test_no_apt_deps(self):
-        runner = MagicMock()
+        runner = _FakeRunner()
         v = DependencyValidator(runner)
         ok, missing = v.validate({})
         self.assertTrue(ok)
         self.assertEqual(missing, [])
-        runner.run.assert_not_called()
+        self.assertEqual(runner.calls, [])
 
     def test_empty_apt_deps(self):
-        runner = MagicMock()
+        runner = _FakeRunner()
         v = DependencyValidator(runner)
         ok, missing = v.validate({"apt_deps": []})
         self.assertTrue(ok)
         self.assertEqual(missing, [])
 
     def test_all_installed(self):
-        runner = MagicMock()
-        runner.run.return_value = 0
+        runner = _FakeRunner(0)
         v = DependencyValidator(runner)
         with patch("builtins.print"):
             ok, missing = v.validate(
@@ -160,11 +175,10 @@ def test_all_installed(self):
             )
         self.assertTrue(ok)
         self.assertEqual(missing, [])
-        self.assertEqual(runner.run.call_count, 2)
+        self.assertEqual(len(runner.calls), 2)
 
     def test_some_missing(self):
-        runner = MagicMock()
-        runner.run.side_effect = [0, 1, 0]
+        runner = _FakeRunner([0, 1, 0])
         v = DependencyValidator(runner)
         with patch("builtins.print"):
             ok, missing = v.validate(
@@ -177,8 +191,7 @@ def test_some_missing(self):
         self.assertEqual(missing, ["libpsl-dev"])
 
     def test_all_missing(self):
-        runner = MagicMock()
-        runner.run.return_value = 1
+        runner = _FakeRunner(1)
         v = DependencyValidator(runner)
         with patch("builtins.print"):
             ok, missing = v.validate(
@@ -188,20 +201,12 @@ def test_all_missing(self):
         self.assertEqual(missing, ["a", "b"])
 
     def test_prints_install_hint(self):
-        runner = MagicMock()
-        runner.run.return_value = 1
+        runner = _FakeRunner(1)
         v = DependencyValidator(runner)
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             v.validate({"apt_deps": ["libfoo-dev"]})
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("apt-get install", output)
         self.assertIn("libfoo-dev", output)
 
@@ -213,54 +218,61 @@ def test_prints_install_hint(self):
 class TestRepoCloner(unittest.TestCase):
     """Tests for RepoCloner."""
 
+    @classmethod
+    def setUpClass(cls):
+        # One scratch directory for the whole class; each
+        # test uses a repos_dir named after itself inside it
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        self.repos_dir = self.tmp / self._testMethodName
+        self.paths = {"repos_dir": str(self.repos_dir)}
+
     def test_skips_existing_repo(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            repo_dir = Path(tmpdir) / "myrepo"
-            repo_dir.mkdir()
-            (repo_dir / "file.txt").touch()
+        repo_dir = self.repos_dir / "myrepo"
+        repo_dir.mkdir(parents=True)
+        (repo_dir / "file.txt").touch()
 
-            runner = MagicMock()
-            cloner = RepoCloner(runner)
-            paths = {"repos_dir": tmpdir}
-            cfg = {"url": "x", "branch": "main"}
+        runner = _FakeRunner()
+        cloner = RepoCloner(runner)
+        cfg = {"url": "x", "branch": "main"}
 
-            with patch("builtins.print"):
-                result = cloner.clone(
-                    "myrepo", cfg, paths
-                )
-            self.assertEqual(
-                result, str(repo_dir)
+        with patch("builtins.print"):
+            result = cloner.clone(
+                "myrepo", cfg, self.paths
             )
-            runner.run.assert_not_called()
+        self.assertEqual(
+            result, str(repo_dir)
+        )
+        self.assertEqual(runner.calls, [])
 
     def test_clones_new_repo(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = MagicMock()
-            runner.run.return_value = 0
-            cloner = RepoCloner(runner)
-            paths = {"repos_dir": tmpdir}
-            cfg = {
-                "url": "https://github.com/x/y.git",
-                "branch": "main",
-            }
+        runner = _FakeRunner(0)
+        cloner = RepoCloner(runner)
+        cfg = {
+            "url": "https://github.com/x/y.git",
+            "branch": "main",
+        }
 
-            cloner.clone("newrepo", cfg, paths)
-            runner.run.assert_called_once()
-            call_args = runner.run.call_args
-            self.assertIn("git clone", call_args[0][0])
-            self.assertIn("main", call_args[0][0])
+        cloner.clone("newrepo", cfg, self.paths)
+        self.assertEqual(len(runner.calls), 1)
+        self.assertIn("git clone", runner.calls[0])
+        self.assertIn("--branch main", runner.calls[0])
 
     def test_default_branch_master(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            runner = MagicMock()
-            runner.run.return_value = 0
-            cloner = RepoCloner(runner)
-            paths = {"repos_dir": tmpdir}
-            cfg = {"url": "https://github.com/x/y.git"}
+        runner = _FakeRunner(0)
+        cloner = RepoCloner(runner)
+        cfg = {"url": "https://github.com/x/y.git"}
 
-            cloner.clone("repo", cfg, paths)
-            call_args = runner.run.call_args
-            self.assertIn("master", call_args[0][0])
+        cloner.clone("repo", cfg, self.paths)
+        self.assertIn(
+            "--branch master", runner.calls[-1]
+        )
 
 
 # ============================================================
@@ -289,8 +301,7 @@ def _cfg(self):
         )
 
     def test_success(self):
-        runner = MagicMock()
-        runner.run.return_value = 0
+        runner = _FakeRunner(0)
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
 
@@ -300,11 +311,10 @@ def test_success(self):
             )
         self.assertTrue(result)
         # clean + 2 pre-build + instrumented + ADG = 5
-        self.assertEqual(runner.run.call_count, 5)
+        self.assertEqual(len(runner.calls), 5)
 
     def test_success_no_clean_cmd(self):
-        runner = MagicMock()
-        runner.run.return_value = 0
+        runner = _FakeRunner(0)
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
         del repo_cfg["clean_cmd"]
@@ -315,12 +325,11 @@ def test_success_no_clean_cmd(self):
             )
         self.assertTrue(result)
         # no clean + 2 pre-build + instrumented + ADG = 4
-        self.assertEqual(runner.run.call_count, 4)
+        self.assertEqual(len(runner.calls), 4)
 
     def test_prebuild_failure(self):
-        runner = MagicMock()
         # clean ok, first pre-build fails
-        runner.run.side_effect = [0, 1]
+        runner = _FakeRunner([0, 1])
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
 
@@ -331,9 +340,8 @@ def test_prebuild_failure(self):
         self.assertFalse(result)
 
     def test_make_failure(self):
-        runner = MagicMock()
         # clean ok, 2 pre-build ok, instrumented fails
-        runner.run.side_effect = [0, 0, 0, 1]
+        runner = _FakeRunner([0, 0, 0, 1])
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
 
@@ -344,9 +352,8 @@ def test_make_failure(self):
         self.assertFalse(result)
 
     def test_adg_failure(self):
-        runner = MagicMock()
         # clean ok, 2 pre-build ok, instrumented ok, ADG fails
-        runner.run.side_effect = [0, 0, 0, 0, 1]
+        runner = _FakeRunner([0, 0, 0, 0, 1])
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
 
@@ -357,9 +364,8 @@ def test_adg_failure(self):
         self.assertFalse(result)
 
     def test_clean_failure_ignored(self):
-        runner = MagicMock()
         # clean fails (fresh clone), rest succeeds
-        runner.run.side_effect = [1, 0, 0, 0, 0]
+        runner = _FakeRunner([1, 0, 0, 0, 0])
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
 
@@ -370,8 +376,7 @@ def test_clean_failure_ignored(self):
         self.assertTrue(result)
 
     def test_instrumented_cmd_uses_tracer(self):
-        runner = MagicMock()
-        runner.run.return_value = 0
+        runner = _FakeRunner(0)
         builder = BomtraceBuilder(runner)
         repo_cfg, paths, omnibor = self._cfg()
 
@@ -380,10 +385,7 @@ def test_instrumented_cmd_uses_tracer(self):
                 "curl", repo_cfg, paths, omnibor
             )
         # clean(0) + pre-build(1,2) + instrumented(3)
-        instrumented_call = runner.run.call_args_list[3]
-        self.assertIn(
-            "bomtrace3", instrumented_call[0][0]
-        )
+        self.assertIn("bomtrace3", runner.calls[3])
 
 
 # ============================================================
@@ -578,20 +580,13 @@ def test_generate_warns_on_failure(self):
             }
             omnibor = {"sbom_script": "x"}
 
-            printed = []
-            with patch(
-                "builtins.print",
-                side_effect=lambda *a, **kw: (
-                    printed.append(
-                        " ".join(str(x) for x in a)
-                    )
-                ),
-            ):
+            buf = io.StringIO()
+            with contextlib.redirect_stdout(buf):
                 gen.generate(
                     "curl", repo_cfg,
                     paths, omnibor,
                 )
-            output = "\n".join(printed)
+            output = buf.getvalue()
             self.assertIn("WARN", output)
 
 
@@ -1224,21 +1219,14 @@ def _minimal_spdx(self):
 
     def test_validate_file_not_found(self):
         v = SpdxValidator()
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             result = v.validate("/nonexistent.json")
         self.assertIsNone(result["schema_ok"])
         self.assertIsNone(result["semantic_ok"])
         self.assertIn(
             "not found",
-            "\n".join(printed),
+            buf.getvalue(),
         )
 
     def test_validate_invalid_json(self):
@@ -1251,18 +1239,11 @@ def test_validate_invalid_json(self):
             f.write("not json{{{")
             path = f.name
         try:
-            printed = []
-            with patch(
-                "builtins.print",
-                side_effect=lambda *a, **kw: (
-                    printed.append(
-                        " ".join(str(x) for x in a)
-                    )
-                ),
-            ):
+            buf = io.StringIO()
+            with contextlib.redirect_stdout(buf):
                 result = v.validate(path)
             self.assertIsNone(result["schema_ok"])
-            output = "\n".join(printed)
+            output = buf.getvalue()
             self.assertIn("Cannot read", output)
         finally:
             Path(path).unlink()
@@ -1399,15 +1380,8 @@ def test_semantic_parse_error(self):
 
     def test_print_summary_pass(self):
         """Summary prints PASS for valid results."""
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             SpdxValidator._print_summary(
                 "/tmp/test.spdx.json",
                 {
@@ -1417,20 +1391,13 @@ def test_print_summary_pass(self):
                     "semantic_errors": [],
                 },
             )
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("PASS", output)
 
     def test_print_summary_fail(self):
         """Summary prints FAIL with error count."""
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             SpdxValidator._print_summary(
                 "/tmp/test.spdx.json",
                 {
@@ -1440,21 +1407,14 @@ def test_print_summary_fail(self):
                     "semantic_errors": ["err3"],
                 },
             )
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("FAIL", output)
         self.assertIn("2 errors", output)
 
     def test_print_summary_skipped(self):
         """Summary prints SKIPPED when None."""
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             SpdxValidator._print_summary(
                 "/tmp/test.spdx.json",
                 {
@@ -1464,7 +1424,7 @@ def test_print_summary_skipped(self):
                     "semantic_errors": [],
                 },
             )
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("SKIPPED", output)
 
 
@@ -1500,17 +1460,10 @@ def test_generate_warns_on_failure(self):
                 "output_dir": tmpdir,
             }
 
-            printed = []
-            with patch(
-                "builtins.print",
-                side_effect=lambda *a, **kw: (
-                    printed.append(
-                        " ".join(str(x) for x in a)
-                    )
-                ),
-            ):
+            buf = io.StringIO()
+            with contextlib.redirect_stdout(buf):
                 gen.generate("curl", paths)
-            output = "\n".join(printed)
+            output = buf.getvalue()
             self.assertIn("WARN", output)
 
 
@@ -1579,21 +1532,14 @@ def test_collect_missing_binary_warns(self, _ts):
                 ],
             }
 
-            printed = []
-            with patch(
-                "builtins.print",
-                side_effect=lambda *a, **kw: (
-                    printed.append(
-                        " ".join(str(x) for x in a)
-                    )
-                ),
-            ):
+            buf = io.StringIO()
+            with contextlib.redirect_stdout(buf):
                 result = BinaryCollector.collect(
                     "curl", cfg, paths
                 )
 
             self.assertEqual(len(result), 0)
-            output = "\n".join(printed)
+            output = buf.getvalue()
             self.assertIn("not found", output)
 
     def test_collect_no_output_binaries_defined(self):
@@ -1603,21 +1549,14 @@ def test_collect_no_output_binaries_defined(self):
         }
         cfg = {}
 
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             result = BinaryCollector.collect(
                 "curl", cfg, paths
             )
 
         self.assertEqual(len(result), 0)
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("No output_binaries", output)
 
     @patch("analyze.timestamp", return_value="2026-02-12_1300")
@@ -1794,17 +1733,10 @@ def test_list_repos(self):
                 },
             }
         }
-        printed = []
-        with patch(
-            "builtins.print",
-            side_effect=lambda *a, **kw: (
-                printed.append(
-                    " ".join(str(x) for x in a)
-                )
-            ),
-        ):
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
             AnalysisPipeline.list_repos(config)
-        output = "\n".join(printed)
+        output = buf.getvalue()
         self.assertIn("curl", output)
         self.assertIn("URL lib", output)
 
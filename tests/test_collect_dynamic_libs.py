@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for app/collect_dynamic_libs.py — ldd/dpkg library collection.
+
+Uses unittest.mock to avoid running ldd, readelf or dpkg.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+# Add app/ to path so we can import collect_dynamic_libs
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+import collect_dynamic_libs
+
+
+SYSTEM_LIB = "/lib/x86_64-linux-gnu/libz.so.1"
+
+
+class TestBuildTreeSkip(unittest.TestCase):
+    """Tests for skipping dpkg lookups on build-tree libraries."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dpkg_paths = []
+
+    def _run(self, binary_path, local_lib):
+        ldd_out = (
+            f"\tlibz.so.1 => {SYSTEM_LIB} (0x1)\n"
+            f"\tlibcurl.so.4 => {local_lib} (0x2)\n"
+        )
+        readelf_out = (
+            " 0x1 (NEEDED) Shared library: [libz.so.1]\n"
+        )
+
+        def fake_check_output(cmd, **kwargs):
+            if cmd[0] == "ldd":
+                return ldd_out
+            if cmd[0] == "readelf":
+                return readelf_out
+            if cmd[0] == "dpkg":
+                self.dpkg_paths.append(cmd[2])
+                return f"zlib1g:amd64: {cmd[2]}\n"
+            return "1.2.13|zlib||||amd64"
+
+        with patch.object(
+            collect_dynamic_libs.subprocess, "check_output",
+            side_effect=fake_check_output,
+        ), redirect_stdout(io.StringIO()):
+            collect_dynamic_libs.main(binary_path, self.tmp.name)
+        with open(
+            os.path.join(self.tmp.name, "dynamic_libs.json")
+        ) as f:
+            return json.load(f)["dynamic_libs"]
+
+    def test_bare_binary_name_still_resolves_system_libs(self):
+        local_lib = os.path.join(os.getcwd(), "libcurl.so.4")
+        libs = self._run("curl", local_lib)
+        self.assertEqual(libs["libz.so.1"]["dpkg_package"], "zlib1g")
+        self.assertIsNone(libs["libcurl.so.4"]["dpkg_package"])
+        self.assertNotIn(local_lib, self.dpkg_paths)
+
+    def test_relative_binary_path_skips_build_tree_libs(self):
+        local_lib = os.path.join(
+            os.getcwd(), "src", "libcurl.so.4",
+        )
+        libs = self._run(os.path.join(".", "src", "curl"), local_lib)
+        self.assertEqual(libs["libz.so.1"]["dpkg_package"], "zlib1g")
+        self.assertIsNone(libs["libcurl.so.4"]["dpkg_package"])
+        self.assertNotIn(local_lib, self.dpkg_paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
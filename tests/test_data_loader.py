@@ -2,6 +2,7 @@
 """Tests for app/data_loader.py — class-based external data loading."""
 
 import json
+import os
 import sys
 import tempfile
 import unittest
@@ -183,6 +184,18 @@ def test_write_atomic_no_tmp(self):
             )
             self.assertTrue(path.exists())
 
+    def test_meta_present(self):
+        self.assertEqual(
+            JsonCache.meta({"_meta": {"a": 1}}),
+            {"a": 1},
+        )
+
+    def test_meta_missing_is_read_only(self):
+        meta = JsonCache.meta({"foo": "bar"})
+        self.assertEqual(dict(meta), {})
+        with self.assertRaises(TypeError):
+            meta["x"] = 1
+
     def test_age_days_none_data(self):
         self.assertIsNone(JsonCache.age_days(None))
 
@@ -265,6 +278,16 @@ def test_skips_non_debian(self):
         ]
         self.assertIsNone(r.find_dev_package(data))
 
+    def test_skips_unlisted_debian_release(self):
+        r = RepologyResolver()
+        data = [
+            {
+                "repo": "debian_11",
+                "binnames": ["libssl-dev"],
+            },
+        ]
+        self.assertIsNone(r.find_dev_package(data))
+
     def test_no_dev_package(self):
         r = RepologyResolver()
         data = [
@@ -428,6 +451,64 @@ def test_load_build_systems_skips_bad(self):
             len(loader.load_build_systems()), 1
         )
 
+    def test_load_build_systems_cached_by_mtime(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bs_file = Path(tmpdir) / "build_systems.json"
+            bs_file.write_text(json.dumps({
+                "indicators": [
+                    {"file": "a", "system": "make-only"},
+                ]
+            }))
+            cache = MagicMock(wraps=JsonCache())
+            loader = DataLoader(
+                data_dir=Path(tmpdir), cache=cache,
+            )
+            first = loader.load_build_systems()
+            second = loader.load_build_systems()
+            self.assertEqual(first, second)
+            self.assertEqual(cache.read.call_count, 1)
+
+    def test_load_dependencies_cached_by_mtime(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            deps_file = Path(tmpdir) / "dependencies.json"
+            deps_file.write_text(json.dumps({
+                "libraries": {"zlib": {"apt_packages": []}}
+            }))
+            cache = MagicMock(wraps=JsonCache())
+            loader = DataLoader(
+                data_dir=Path(tmpdir), cache=cache,
+            )
+            first = loader.load_dependencies()
+            self.assertIs(loader.load_dependencies(), first)
+            self.assertEqual(cache.read.call_count, 1)
+
+            stat = deps_file.stat()
+            deps_file.write_text(json.dumps({
+                "libraries": {"xz": {"apt_packages": []}}
+            }))
+            os.utime(deps_file, ns=(
+                stat.st_atime_ns, stat.st_mtime_ns + 1,
+            ))
+            self.assertIn("xz", loader.load_dependencies())
+
+    def test_default_cache_shared_across_loaders(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bs_file = Path(tmpdir) / "build_systems.json"
+            bs_file.write_text(json.dumps({
+                "indicators": [
+                    {"file": "a", "system": "make-only"},
+                ]
+            }))
+            first = DataLoader(data_dir=Path(tmpdir))
+            first.load_build_systems()
+            with patch.object(JsonCache, "read") as read:
+                second = DataLoader(data_dir=Path(tmpdir))
+                self.assertEqual(
+                    second.load_build_systems(),
+                    [("a", "make-only")],
+                )
+                read.assert_not_called()
+
     def test_load_dependencies(self):
         loader, cache, _ = self._loader({
             "_meta": {"cache_max_age_days": 7},
@@ -493,6 +574,20 @@ def test_lookup_case_insensitive(self):
             result["apt_packages"], ["libssl-dev"]
         )
 
+    def test_lookup_case_insensitive_index_refresh(self):
+        loader, _, resolver = self._loader(None)
+        resolver.resolve_unknown.return_value = None
+        deps = {"OpenSSL": {"apt_packages": ["a"]}}
+        self.assertEqual(
+            loader.lookup_dependency("openssl", deps),
+            {"apt_packages": ["a"]},
+        )
+        deps["ZLib"] = {"apt_packages": ["b"]}
+        self.assertEqual(
+            loader.lookup_dependency("zlib", deps),
+            {"apt_packages": ["b"]},
+        )
+
     def test_lookup_repology_on_miss(self):
         loader, cache, resolver = self._loader(None)
         resolver.resolve_unknown.return_value = {
@@ -525,6 +620,39 @@ def test_lookup_no_persist_no_libraries(self):
         self.assertIsNotNone(result)
         cache.write.assert_not_called()
 
+    def test_lookup_many_writes_once(self):
+        loader, cache, resolver = self._loader(None)
+        resolver.resolve_unknown.side_effect = (
+            lambda name: {"apt_packages": [f"{name}-dev"]}
+        )
+        cache.read.return_value = {"libraries": {}}
+        result = loader.lookup_many(
+            ["a", "b", "a"], {"c": {}}
+        )
+        self.assertEqual(
+            result["b"], {"apt_packages": ["b-dev"]}
+        )
+        self.assertEqual(
+            resolver.resolve_unknown.call_count, 2
+        )
+        cache.write.assert_called_once()
+        written = cache.write.call_args[0][1]
+        self.assertEqual(
+            sorted(written["libraries"]), ["a", "b"]
+        )
+
+    def test_batch_defers_write(self):
+        loader, cache, resolver = self._loader(None)
+        resolver.resolve_unknown.return_value = {
+            "apt_packages": ["libnew-dev"]
+        }
+        cache.read.return_value = {"libraries": {}}
+        with loader.batch():
+            loader.lookup_dependency("newlib", {})
+            cache.write.assert_not_called()
+        cache.write.assert_called_once()
+        self.assertEqual(loader.flush(), 0)
+
     @patch("data_loader.time.sleep")
     def test_refresh_all_stale(self, mock_sleep):
         loader, cache, resolver = self._loader(None)
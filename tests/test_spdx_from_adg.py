@@ -1,5 +1,8 @@
 """Tests for spdx_from_adg module."""
+import gzip
+import io
 import json
+import pickle
 import sys
 import tempfile
 import unittest
@@ -12,13 +15,76 @@
 
 from spdx_from_adg import (
     AdgParser,
+    ArtifactTable,
     AdgSpdxGenerator,
     ComponentResolver,
     SpdxEmitter,
     VendoredVersionDetector,
+    compact_doc,
 )
 
 
+class TestArtifactTable(unittest.TestCase):
+    """Tests for ArtifactTable."""
+
+    def test_rows(self):
+        t = ArtifactTable()
+        t.append("aaa", "/a.c")
+        t.append("bbb", "/b.o", "gcc -c b.c")
+        self.assertEqual(len(t), 2)
+        self.assertEqual(
+            t[0], {"sha1": "aaa", "file_path": "/a.c"}
+        )
+        self.assertEqual(
+            t[-1]["build_cmd"], "gcc -c b.c"
+        )
+        self.assertEqual(
+            [r["sha1"] for r in t], ["aaa", "bbb"]
+        )
+        self.assertEqual(t.file_path, ["/a.c", "/b.o"])
+
+    def test_sha1_stored_as_digest(self):
+        sha = "0123456789abcdef" * 2 + "01234567"
+        t = ArtifactTable()
+        t.append(sha, "/a.c")
+        t.append(sha.upper(), "/b.c")
+        self.assertEqual(t.sha1[0], bytes.fromhex(sha))
+        self.assertEqual(t.sha1[1], sha.upper())
+        self.assertEqual(
+            [r["sha1"] for r in t], [sha, sha.upper()]
+        )
+
+    def test_slice(self):
+        t = ArtifactTable()
+        t.append("aaa", "/a.c")
+        t.append("bbb", "/b.o")
+        t.append("ccc", "/c.o")
+        self.assertEqual(
+            [r["sha1"] for r in t[1:3]], ["bbb", "ccc"]
+        )
+        self.assertEqual(t[5:], [])
+
+    def test_none_build_cmd_kept(self):
+        t = ArtifactTable()
+        t.append("aaa", "/a.c", None)
+        t.append("bbb", "/b.c")
+        self.assertIn("build_cmd", t[0])
+        self.assertIsNone(t[0]["build_cmd"])
+        self.assertNotIn("build_cmd", t[1])
+
+    def test_pickle_keeps_missing_build_cmd(self):
+        t = ArtifactTable()
+        t.append("aaa", "/a.c")
+        self.assertEqual(
+            pickle.loads(pickle.dumps(t))[0],
+            {"sha1": "aaa", "file_path": "/a.c"},
+        )
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            ArtifactTable()[0]
+
+
 class TestAdgParser(unittest.TestCase):
     """Tests for AdgParser."""
 
@@ -90,6 +156,41 @@ def test_classify_artifacts(self):
                 result["build_intermediate"][0],
             )
 
+    def test_parallel_parse_matches_serial(self):
+        with tempfile.TemporaryDirectory() as td:
+            meta = self._setup_bom_dir(td)
+            paths = [
+                "/usr/lib/x86_64/libz.so",
+                "/usr/include/zlib.h",
+                "/repos/curl/src/main.c",
+                "/repos/curl/src/main.o",
+                "/usr/lib/x86_64/crti.o",
+                "/etc/ld.so.conf",
+            ]
+            treedb = {
+                f"{i:040x}": {
+                    "file_path": paths[i % len(paths)],
+                }
+                for i in range(60)
+            }
+            (meta / "bomsh_omnibor_treedb").write_text(
+                json.dumps(treedb)
+            )
+            bom = str(Path(td) / "bom")
+            serial = AdgParser(bom, "/repos").parse()
+            parser = AdgParser(bom, "/repos", parallel=True)
+            with patch.object(
+                AdgParser, "PARALLEL_THRESHOLD", 10
+            ):
+                par = parser.parse()
+            for category, table in serial.items():
+                self.assertEqual(
+                    list(par[category]), list(table)
+                )
+            self.assertEqual(
+                len(par["system_header"]), 20
+            )
+
     def test_load_doc_mapping(self):
         with tempfile.TemporaryDirectory() as td:
             meta = self._setup_bom_dir(td)
@@ -133,6 +234,45 @@ def test_load_raw_logfile_hashes(self):
             self.assertEqual(result["/repo/curl"], sha)
             self.assertEqual(len(result), 1)
 
+    def test_load_raw_logfile_basenames(self):
+        with tempfile.TemporaryDirectory() as td:
+            meta = self._setup_bom_dir(td)
+            a, b = "a" * 40, "b" * 40
+            (
+                meta / "bomsh_hook_raw_logfile"
+            ).write_text(
+                f"outfile: {a} path: /repo/src/curl\n"
+                f"outfile: {b} path: /repo/x/curl\n"
+            )
+            parser = AdgParser(
+                str(Path(td) / "bom"), "/repos"
+            )
+            basenames = {}
+            parser.load_raw_logfile_hashes(
+                basenames=basenames
+            )
+            self.assertEqual(
+                basenames, {"curl": "/repo/src/curl"}
+            )
+
+    def test_load_raw_logfile_crlf_and_bad_utf8(self):
+        with tempfile.TemporaryDirectory() as td:
+            meta = self._setup_bom_dir(td)
+            sha = "b" * 40
+            (
+                meta / "bomsh_hook_raw_logfile"
+            ).write_bytes(
+                b"\xff\xfe garbage\r\n"
+                + f"outfile: {sha} path: /repo/x\r\n"
+                .encode()
+            )
+
+            parser = AdgParser(
+                str(Path(td) / "bom"), "/repos"
+            )
+            result = parser.load_raw_logfile_hashes()
+            self.assertEqual(result, {"/repo/x": sha})
+
     def test_load_raw_logfile_missing(self):
         with tempfile.TemporaryDirectory() as td:
             self._setup_bom_dir(td)
@@ -296,6 +436,32 @@ def test_resolve_dynamic_components(self):
             self.assertIn("libssl3", names)
             self.assertIn("zlib1g", names)
 
+    def test_resolve_unordered_keeps_input_order(self):
+        with tempfile.TemporaryDirectory() as td:
+            meta = self._base_metadata()
+            path = self._write_metadata(td, meta)
+            resolver = ComponentResolver(path)
+
+            dynlibs = self._base_dynlibs()
+            dynlibs["dynamic_libs"] = dict(
+                reversed(dynlibs["dynamic_libs"].items())
+            )
+            dynlib_path = Path(td) / "dynamic_libs.json"
+            dynlib_path.write_text(json.dumps(dynlibs))
+            resolver.load_dynamic_libs(str(dynlib_path))
+            sources = [
+                c["source"] for c in
+                resolver.resolve_dynamic_components()
+            ]
+            self.assertEqual(sources, ["openssl", "zlib"])
+            sources = [
+                c["source"] for c in
+                resolver.resolve_dynamic_components(
+                    ordered=False
+                )
+            ]
+            self.assertEqual(sources, ["zlib", "openssl"])
+
     def test_direct_flag(self):
         with tempfile.TemporaryDirectory() as td:
             meta = self._base_metadata()
@@ -491,6 +657,119 @@ def test_emit_basic_structure(self):
             len(doc["relationships"]), 2
         )
 
+    def test_emit_bytes(self):
+        emitter = SpdxEmitter(
+            repo_name="curl",
+            repo_version="8.19.0",
+            distro="Ubuntu 22.04",
+            gcc_version="gcc 11.4.0",
+        )
+        blob = emitter.emit_bytes(
+            components=[],
+            project_files=[],
+            doc_mapping={},
+            logfile_hashes={},
+        )
+        self.assertIsInstance(blob, bytes)
+        self.assertTrue(blob.endswith(b"\n"))
+        doc = json.loads(blob)
+        self.assertEqual(
+            doc["spdxVersion"], "SPDX-2.3"
+        )
+
+    def test_path_helpers_match_pathlib(self):
+        paths = [
+            "/workspace/repos/curl/lib/url.c",
+            "/repos/curl/lib/url.C",
+            "/x/a.h",
+            "/a.c",
+            "lib/sub/x.cpp",
+            "lib/x.c",
+            "x.c",
+            "/repos/.hidden",
+            "/repos/curl/Makefile",
+            "/repos/v1.2/README",
+        ]
+        for fp in paths:
+            p = Path(fp)
+            self.assertEqual(
+                SpdxEmitter._name_and_suffix(fp),
+                (p.name, p.suffix.lower()),
+            )
+            try:
+                expected = str(p.relative_to(
+                    p.parents[len(p.parts) - 3]
+                ))
+            except (ValueError, IndexError):
+                expected = fp
+            self.assertEqual(
+                SpdxEmitter._rel_path(fp), expected
+            )
+
+    def test_sanitize_spdx_id(self):
+        self.assertEqual(
+            SpdxEmitter._sanitize_spdx_id("lib foo+bar_1.2"),
+            "lib-foo-bar_1.2",
+        )
+
+    def test_serialize_compact_round_trip(self):
+        from spdx_visualize import revive_compact
+        doc = {
+            "spdxVersion": "SPDX-2.3",
+            "files": [
+                {"SPDXID": "SPDXRef-F1", "fileName": "a.c"},
+                {"SPDXID": "SPDXRef-F2", "fileName": "b.c"},
+            ],
+            "relationships": [
+                {"a": 1, "b": 2},
+                {"a": 3},
+            ],
+        }
+        packed = json.loads(
+            SpdxEmitter.serialize(doc, compact=True)
+        )
+        self.assertEqual(
+            packed["files"][:3], [2, "SPDXID", "fileName"]
+        )
+        # Mixed shapes are left unpacked
+        self.assertEqual(
+            packed["relationships"], doc["relationships"]
+        )
+        self.assertEqual(revive_compact(packed), doc)
+        # compact_doc does not touch the original
+        self.assertIsInstance(
+            compact_doc(doc)["files"][0], int
+        )
+        self.assertIsInstance(doc["files"][0], dict)
+
+    def test_serialize_compact_keyless_rows(self):
+        from spdx_visualize import revive_compact
+        doc = {"files": [{}, {}], "relationships": []}
+        packed = json.loads(
+            SpdxEmitter.serialize(doc, compact=True)
+        )
+        self.assertEqual(packed["files"], [{}, {}])
+        self.assertEqual(revive_compact(packed), doc)
+        # A zero-key packed array revives without error
+        self.assertEqual(
+            revive_compact({"files": [0]})["files"], []
+        )
+
+    def test_dump_matches_serialize(self):
+        doc = {
+            "name": "curl\u00e9",
+            "files": [{"SPDXID": "SPDXRef-F1"}],
+        }
+        for compact in (False, True):
+            buf = io.StringIO()
+            SpdxEmitter.dump(doc, buf, compact=compact)
+            self.assertEqual(
+                buf.getvalue().encode("utf-8"),
+                SpdxEmitter.serialize(
+                    doc, compact=compact
+                ),
+            )
+
     def test_emit_with_components(self):
         emitter = SpdxEmitter(
             repo_name="curl",
@@ -671,6 +950,35 @@ def test_emit_with_omnibor_ref(self):
             gitoid_refs[0]["referenceLocator"],
         )
 
+    def test_emit_omnibor_ref_via_basenames(self):
+        sha = "a" * 40
+        emitter = SpdxEmitter(
+            repo_name="curl",
+            repo_version="8.19.0",
+            distro="Ubuntu 22.04",
+            gcc_version="gcc 11.4.0",
+        )
+        doc = emitter.emit(
+            components=[],
+            project_files=[],
+            doc_mapping={sha: "omnibor_doc_123"},
+            logfile_hashes={
+                "/repo/lib/curl.o": "b" * 40,
+                "/repo/src/.libs/curl": sha,
+            },
+            logfile_basenames={
+                "curl": "/repo/src/.libs/curl",
+            },
+        )
+        root = doc["packages"][0]
+        self.assertEqual(
+            root["checksums"][0]["checksumValue"], sha
+        )
+        self.assertIn(
+            "omnibor_doc_123",
+            root["externalRefs"][0]["referenceLocator"],
+        )
+
     def test_emit_with_source_files(self):
         emitter = SpdxEmitter(
             repo_name="curl",
@@ -698,6 +1006,43 @@ def test_emit_with_source_files(self):
             any("main.c" in f for f in fnames)
         )
 
+    def test_stream_emit_matches_emit(self):
+        kwargs = dict(
+            components=[{
+                "name": "zlib",
+                "version": "1.2.11",
+                "homepage": "https://zlib.net",
+                "sonames": ["libz.so.1"],
+                "direct": True,
+            }],
+            project_files=[
+                {"sha1": "abc", "file_path": "/repos/curl/src/main.c"},
+                {"sha1": "def", "file_path": "/repos/curl/Makefile"},
+                {"sha1": "ghi", "file_path": "/repos/curl/deps/x/x.c"},
+            ],
+            doc_mapping={},
+            logfile_hashes={},
+        )
+
+        def emitter():
+            return SpdxEmitter(
+                repo_name="curl",
+                repo_version="8.19.0",
+                distro="Ubuntu 22.04",
+                gcc_version="gcc 11.4.0",
+            )
+
+        expected = emitter().emit(**kwargs)
+        buf = io.StringIO()
+        emitter().stream_emit(buf, **kwargs)
+        streamed = json.loads(buf.getvalue())
+        for doc in (expected, streamed):
+            doc.pop("documentNamespace")
+            doc["creationInfo"].pop("created")
+            doc["packages"][0].pop("builtDate")
+        self.assertEqual(streamed, expected)
+        self.assertEqual(len(streamed["files"]), 2)
+
     def test_creators(self):
         emitter = SpdxEmitter(
             repo_name="curl",
@@ -788,6 +1133,21 @@ def test_vendored_dirs_patterns(self):
         )
         self.assertEqual(len(own), 0)
 
+    def test_vendored_nested_uses_outermost(self):
+        """Nested vendored dirs group by the outermost."""
+        emitter = self._emitter()
+        files = [
+            {"sha1": "a", "file_path":
+                "/r/vendor/libA/deps/libB/x.c"},
+            {"sha1": "b", "file_path":
+                "/r/my_deps/y.c"},
+        ]
+        vendored, own = (
+            emitter._detect_vendored_groups(files)
+        )
+        self.assertEqual(list(vendored), ["libA"])
+        self.assertEqual(len(own), 1)
+
     def test_emit_creates_vendored_packages(self):
         """Vendored libs become SPDX packages."""
         emitter = self._emitter()
@@ -1454,6 +1814,84 @@ def test_generate_success(self):
                 len(doc["packages"]), 3
             )
 
+    def test_generate_gzip_output(self):
+        with tempfile.TemporaryDirectory() as td:
+            bom_dir = self._setup_full(td)
+            out = str(Path(td) / "curl.spdx.json.gz")
+            gen = AdgSpdxGenerator(
+                bom_dir=bom_dir,
+                repos_dir="/repos",
+                repo_name="curl",
+            )
+            with patch.dict(
+                "os.environ", {"OMNIBOR_GZIP_LEVEL": "9"}
+            ), patch("builtins.print"):
+                result = gen.generate(out)
+            self.assertEqual(result, out)
+            doc = json.loads(
+                gzip.decompress(Path(out).read_bytes())
+            )
+            self.assertEqual(
+                doc["spdxVersion"], "SPDX-2.3"
+            )
+            self.assertTrue(
+                (Path(td) / "curl.spdx.html").exists()
+            )
+
+    def test_gzip_level_from_env(self):
+        for value, level in (
+            ("1", 1), ("x", 6), ("42", 6),
+        ):
+            with patch.dict(
+                "os.environ", {"OMNIBOR_GZIP_LEVEL": value}
+            ):
+                self.assertEqual(
+                    AdgSpdxGenerator._gzip_level(), level
+                )
+
+    def test_generate_static_only_skips_dynlibs(self):
+        with tempfile.TemporaryDirectory() as td:
+            bom_dir = self._setup_full(td)
+            (
+                Path(bom_dir) / "metadata"
+                / "dynamic_libs.json"
+            ).unlink()
+            out = str(Path(td) / "curl.spdx.json")
+            gen = AdgSpdxGenerator(
+                bom_dir=bom_dir,
+                repos_dir="/repos",
+                repo_name="curl",
+            )
+            with patch("builtins.print"):
+                result = gen.generate(
+                    out, static_only=True
+                )
+            self.assertEqual(result, out)
+            doc = json.loads(Path(out).read_text())
+            # Root + gcc
+            self.assertEqual(len(doc["packages"]), 2)
+
+    def test_generate_reuses_parsed_adg(self):
+        with tempfile.TemporaryDirectory() as td:
+            bom_dir = self._setup_full(td)
+            gen = AdgSpdxGenerator(
+                bom_dir=bom_dir,
+                repos_dir="/repos",
+                repo_name="curl",
+            )
+            with patch(
+                "spdx_from_adg.AdgParser.parse",
+                autospec=True,
+                side_effect=AdgParser.parse,
+            ) as parse, patch("builtins.print"):
+                gen.generate(str(Path(td) / "a.json"))
+                gen.generate(
+                    str(Path(td) / "b.json"),
+                    binary_name="libcurl.so",
+                )
+            parse.assert_called_once()
+            self.assertEqual(len(gen._resolver_cache), 1)
+
     def test_generate_per_binary_with_dynlib_dir(self):
         """Generate SPDX for libcurl.so with separate dynlib_dir."""
         with tempfile.TemporaryDirectory() as td: